@@ -1,15 +1,43 @@
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel
-from statsbombpy import sb
-import google.generativeai as genai
-import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from contextlib import asynccontextmanager
+import asyncio
+import importlib
+import threading
+import time
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning)
 import os
+import sys
 from dotenv import load_dotenv
 load_dotenv('../.env')
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum.cache import CachePartidas, CacheTTL
+from comum.cache_http import chave_url, etag_confere, etag_forte
+from comum.cache_narracoes import CacheNarracoes
+from comum.concorrencia import ChamadaUnica, em_thread, iterar_em_thread
+from comum import metricas
+from comum.llm import LLMIndisponivel, cliente_llm
+from comum.streaming import evento_sse
 
-app = FastAPI()
+# Os módulos de dados (pandas, pyarrow, statsbombpy) são importados só nas funções que os usam, então o
+# worker sobe e já aceita conexões sem esperar por eles. Para a primeira requisição também não pagar esse
+# import, uma thread os carrega assim que a aplicação inicia (API_PRECARREGAR=0 desliga).
+MODULOS_DADOS = ["comum.eventos", "comum.jogadores", "comum.agregacao", "comum.espacial",
+                 "comum.ao_vivo", "comum.exportacao", "comum.temporada"]
+
+def precarregar():
+    for modulo in MODULOS_DADOS:
+        importlib.import_module(modulo)
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    if os.environ.get("API_PRECARREGAR", "1") == "1":
+        threading.Thread(target=precarregar, name="precarregar", daemon=True).start()
+    yield
+
+app = FastAPI(lifespan=ciclo_de_vida)
 
 class MatchSummaryResponse(BaseModel):
     match_id: int
@@ -50,157 +78,534 @@ class TeamEventsNarrationResponse(BaseModel):
     events_summary: list[TeamEventsResponse]
     narration: str
 
-def sb_eventos_partida(partida_id):
-    eventos = sb.events(match_id=partida_id)
-    if 'location' in eventos.columns:
-        eventos_validos = eventos[eventos['location'].apply(lambda x: isinstance(x, list) and len(x) == 2)]
-        if not eventos_validos.empty:
-            eventos_validos.loc[:, ['localizacao_x', 'localizacao_y']] = pd.DataFrame(eventos_validos['location'].tolist(), index=eventos_validos.index)
-            eventos = eventos_validos
-    return eventos
-
-def identificar_eventos_por_time(eventos_df):
-    times = eventos_df['team'].unique()
-    eventos_times = {}
-
-    for time in times:
-        eventos_time = eventos_df[eventos_df['team'] == time]
-
-        gols = eventos_time[(eventos_time['type'] == 'Shot') & (eventos_time['shot_outcome'] == 'Goal')]
-        gols_por_jogador = gols.groupby('player').size()
-        
-        assistencias = eventos_time[eventos_time['pass_goal_assist'] == True]
-        assistencias_por_jogador = assistencias.groupby('player').size()
-        
-        cartões_amarelos = eventos_time[
-            (eventos_time['bad_behaviour_card'] == 'Yellow Card') | (eventos_time['foul_committed_card'] == 'Yellow Card')
-        ]
-        cartões_vermelhos = eventos_time[
-            (eventos_time['bad_behaviour_card'] == 'Red Card') | (eventos_time['foul_committed_card'] == 'Red Card')
-        ]
-        total_cartoes_amarelos = len(cartões_amarelos)
-        total_cartoes_vermelhos = len(cartões_vermelhos)
-
-        desarmes = eventos_time[eventos_time['type'] == 'Duel']
-        duelos_ganhos = desarmes[desarmes['duel_outcome'] == 'Won'] if 'duel_outcome' in desarmes.columns else desarmes
-
-        interceptacoes = eventos_time[eventos_time['type'] == 'Interception']
-        interceptacoes_bem_sucedidas = interceptacoes[interceptacoes['interception_outcome'] == 'Won'] if 'interception_outcome' in interceptacoes.columns else interceptacoes
-
-        recuperacoes_bola = eventos_time[eventos_time['type'] == 'Ball Recovery']
-        falhas_recuperacao = recuperacoes_bola[recuperacoes_bola['ball_recovery_recovery_failure'] == True] if 'ball_recovery_recovery_failure' in recuperacoes_bola.columns else None
-
-        eventos_times[time] = {
-            "gols": gols_por_jogador,
-            "jogadores_gols": gols['player'].unique(),
-            "assistencias": assistencias_por_jogador,
-            "jogadores_assistencias": assistencias['player'].unique(),
-            "cartoes_amarelos": total_cartoes_amarelos,
-            "cartoes_vermelhos": total_cartoes_vermelhos,
-            "desarmes_totais": len(desarmes),
-            "duelos_ganhos": len(duelos_ganhos),
-            "interceptacoes_bem_sucedidas": len(interceptacoes_bem_sucedidas),
-            "falhas_recuperacao_bola": len(falhas_recuperacao) if falhas_recuperacao is not None else 0
-        }
-    return eventos_times
+class MatchSummaryBatchRequest(BaseModel):
+    match_ids: list[int] = Field(..., max_length=500)
+    competition_id: int | None = None
+    season_id: int | None = None
+
+class MatchSummaryBatchItem(BaseModel):
+    match_id: int
+    summary: MatchSummaryResponse | None = None
+    error: str | None = None
+
+class MatchSummaryBatchResponse(BaseModel):
+    results: list[MatchSummaryBatchItem]
+
+class PlayerProfileBatchRequest(BaseModel):
+    match_id: int
+    player_ids: list[int] = Field(..., max_length=500)
+
+class PlayerProfileBatchItem(BaseModel):
+    player_id: int
+    profile: PlayerProfileResponse | None = None
+    error: str | None = None
+
+class PlayerProfileBatchResponse(BaseModel):
+    match_id: int
+    results: list[PlayerProfileBatchItem]
+
+class SeasonLeaderboardResponse(BaseModel):
+    competition_id: int
+    season_id: int
+    matches: int
+    failed_matches: dict[int, str]
+    teams: dict[str, list[dict]]
+    players: dict[str, list[dict]]
+
+class HeatmapResponse(BaseModel):
+    match_id: int
+    group_by: str
+    bins: list[int]
+    pitch: list[float]
+    heatmaps: dict[str, list[list[int]]]
+
+class ZoneCounts(BaseModel):
+    group: str
+    thirds: dict[str, int]
+    grid: list[list[int]]
+
+class ZonesResponse(BaseModel):
+    match_id: int
+    group_by: str
+    zones: list[ZoneCounts]
+
+class PassNetwork(BaseModel):
+    team: str
+    nodes: list[dict]
+    edges: list[dict]
+
+class PassNetworkResponse(BaseModel):
+    match_id: int
+    networks: list[PassNetwork]
+
+chamadas = ChamadaUnica()
+
+# Os dados históricos do StatsBomb não mudam: as respostas GET são guardadas já serializadas, por URL,
+# com um ETag forte. Um If-None-Match igual recebe 304 sem recalcular nem reserializar nada.
+ROTAS_CACHEAVEIS = {"/match_summary", "/player_profile", "/team_events", "/season_leaderboard",
+                    "/spatial/heatmap", "/spatial/zones", "/spatial/pass_network"}
+CACHE_MAX_AGE = int(os.environ.get("API_CACHE_MAX_AGE", "86400"))
+# Respostas parciais (ex.: ranking com partidas que falharam no StatsBomb) não são guardadas e saem com
+# um max-age curto: o próximo pedido tenta de novo as partidas que faltaram.
+CACHE_MAX_AGE_PARCIAL = int(os.environ.get("API_CACHE_MAX_AGE_PARCIAL", "60"))
+respostas_http = CacheTTL(int(os.environ.get("RESPOSTAS_CACHE_MAX", "1024")), CACHE_MAX_AGE)
+
+@app.middleware("http")
+async def cache_http(request: Request, call_next):
+    if request.method != "GET" or request.url.path not in ROTAS_CACHEAVEIS:
+        return await call_next(request)
+
+    chave = chave_url(request.url.path, request.query_params.multi_items())
+    forcar = request.query_params.get("force_refresh", "").lower() in ("1", "true", "yes", "on")
+    memo = None if forcar else respostas_http.obter(chave)
+    if memo is None:
+        resposta = await call_next(request)
+        # Uma rota que define o próprio Cache-Control (resposta parcial) passa direto, sem ir para o cache.
+        if resposta.status_code != 200 or "cache-control" in resposta.headers:
+            return resposta
+        corpo = b"".join([parte async for parte in resposta.body_iterator])
+        memo = (etag_forte(corpo), corpo)
+        respostas_http.guardar(chave, memo)
+
+    etag, corpo = memo
+    cabecalhos = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+    if etag_confere(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabecalhos)
+    return Response(corpo, media_type="application/json", headers=cabecalhos)
+
+cache_partidas = CachePartidas()
+
+async def obter_partida(match_id, competition_id=None, season_id=None):
+    partida = cache_partidas.partida_em_memoria(match_id, competition_id, season_id)
+    if partida is not None:
+        return partida
+    if competition_id is None or season_id is None:
+        temporada = await chamadas.executar(("temporada", match_id), cache_partidas.temporada_da_partida, match_id)
+        if temporada is None:
+            return None
+        competition_id, season_id = temporada
+    partidas = await chamadas.executar(("partidas", competition_id, season_id), cache_partidas.partidas, competition_id, season_id)
+    return partidas.get(match_id)
+
+cache_dados = CacheTTL(int(os.environ.get("EVENTOS_CACHE_MAX", "32")), float(os.environ.get("EVENTOS_CACHE_TTL", "3600")))
+
+def dados_partida(match_id):
+    from comum.eventos import sb_eventos_partida
+    from comum.jogadores import estatisticas_jogadores
+    eventos = sb_eventos_partida(match_id)
+    dados = {"eventos": eventos, "jogadores": estatisticas_jogadores(eventos)}
+    cache_dados.guardar(match_id, dados)
+    return dados
+
+async def carregar_dados_partida(match_id):
+    dados = cache_dados.obter(match_id)
+    if dados is None:
+        dados = await chamadas.executar(("eventos", match_id), dados_partida, match_id)
+    return dados
+
+# Mapas e redes de passes por partida: o resultado de cada combinação de parâmetros fica em memória.
+cache_espacial = CacheTTL(int(os.environ.get("ESPACIAL_CACHE_MAX", "256")), float(os.environ.get("EVENTOS_CACHE_TTL", "3600")))
+
+def calcular_espacial(chave, funcao, *args):
+    resultado = funcao(*args)
+    cache_espacial.guardar(chave, resultado)
+    return resultado
+
+async def analise_espacial(chave, funcao, *args):
+    resultado = cache_espacial.obter(chave)
+    if resultado is None:
+        resultado = await chamadas.executar(("espacial",) + chave, calcular_espacial, chave, funcao, *args)
+    return resultado
+
+def mapas_calor(eventos, por, caixas, tipos):
+    from comum import espacial
+    return {str(grupo): matriz.tolist() for grupo, matriz in espacial.mapa_calor(eventos, por, caixas, tipos).items()}
+
+# Nomes dos terços do comum/espacial.py na resposta da API.
+TERCOS_API = {"defensivo": "defensive", "meio": "middle", "ofensivo": "attacking"}
+
+def zonas(eventos, por, tipos):
+    from comum import espacial
+    return [{"group": str(grupo), "thirds": {TERCOS_API[terco]: n for terco, n in tercos.items()}, "grid": grade.tolist()}
+            for grupo, (tercos, grade) in espacial.zonas_por_grupo(eventos, por, tipos).items()]
+
+def redes_passes(eventos, times, minimo_passes):
+    from comum import espacial
+    redes = []
+    for time_ in times:
+        nos, arestas = espacial.rede_passes(eventos, time_, minimo_passes)
+        redes.append({
+            "team": time_,
+            "nodes": nos.astype({"x": float, "y": float, "passes": int}).to_dict("records"),
+            "edges": arestas.rename(columns={"origem": "source", "destino": "target"}).astype({"passes": int}).to_dict("records"),
+        })
+    return redes
+
+def resumo_eventos_por_time(eventos):
+    from comum.agregacao import identificar_eventos_por_time
+    with metricas.medir("agregacao"):
+        eventos_agrupados = identificar_eventos_por_time(eventos)
+    return formatar_resumo(eventos_agrupados)
+
+def formatar_resumo(eventos_agrupados):
+    team_events_summary = []
+
+    for team, data in eventos_agrupados.items():
+        team_events_summary.append({
+            "team": team,
+            "goals": int(sum(data["gols"])),
+            "goal_scorers": list(data["jogadores_gols"]),
+            "goal_count_per_player": data["gols"].to_dict(),
+            "assists": int(sum(data["assistencias"])),
+            "assist_providers": list(data["jogadores_assistencias"]),
+            "yellow_cards": data["cartoes_amarelos"],
+            "red_cards": data["cartoes_vermelhos"],
+            "tackles": data["desarmes_totais"],
+        })
+    return team_events_summary
+
+cache_narracoes = CacheNarracoes()
+
+metricas.registrar_cache("respostas_http", respostas_http.estatisticas)
+metricas.registrar_cache("eventos", cache_dados.estatisticas)
+metricas.registrar_cache("espacial", cache_espacial.estatisticas)
+metricas.registrar_cache("partidas", lambda: cache_partidas.temporadas.estatisticas())
+metricas.registrar_cache("narracoes", lambda: cache_narracoes.estatisticas())
+
+ESTILOS_NARRACAO = ["formal", "humorística", "técnica"]
+
+def prompt_narracao(team_events_summary, estilo_selecionado):
+    return f"Resumo dos eventos: {team_events_summary}. Narre de forma {estilo_selecionado} os eventos da partida."
+
+def gerar_narracao(team_events_summary, estilo_selecionado, forcar=False):
+    prompt = prompt_narracao(team_events_summary, estilo_selecionado)
+
+    llm = cliente_llm()
+    return cache_narracoes.obter_ou_gerar(llm.modelo, prompt, estilo_selecionado, lambda: llm.gerar(prompt), forcar)
+
+async def resumo_partida(match_id, competition_id=None, season_id=None):
+    match_data = await obter_partida(match_id, competition_id, season_id)
+    if match_data is None:
+        detalhe = "Partida não encontrada"
+        if competition_id is None or season_id is None:
+            detalhe += "; informe competition_id e season_id"
+        raise HTTPException(status_code=404, detail=detalhe)
+    return {campo: match_data[campo] for campo in MatchSummaryResponse.model_fields}
+
+async def perfil_jogador(match_id, player_id):
+    dados = await carregar_dados_partida(match_id)
+    jogador = dados["jogadores"].get(player_id)
+    if jogador is None:
+        raise HTTPException(status_code=404, detail="Jogador não encontrado na partida")
+    return {campo: jogador[campo] for campo in PlayerProfileResponse.model_fields}
+
+def mensagem_erro(e):
+    if isinstance(e, ValidationError):
+        # Ex.: partida sem árbitro ou estádio (NaN) no StatsBomb.
+        return "Dados inválidos: " + "; ".join(f"{'.'.join(map(str, erro['loc']))}: {erro['msg']}" for erro in e.errors())
+    return e.detail if isinstance(e, HTTPException) else str(e)
 
 @app.get("/match_summary", response_model=MatchSummaryResponse)
 async def match_summary(
-    competition_id: int = Query(..., description="ID da competição"),
-    season_id: int = Query(..., description="ID da temporada"),
+    competition_id: int | None = Query(None, description="ID da competição (opcional se a partida já foi vista)"),
+    season_id: int | None = Query(None, description="ID da temporada (opcional se a partida já foi vista)"),
     match_id: int = Query(..., description="ID da partida")
 ):
     try:
-        matches = sb.matches(competition_id=competition_id, season_id=season_id)
-        match = matches[matches["match_id"] == match_id]
-        if match.empty:
-            raise HTTPException(status_code=404, detail="Partida não encontrada")
-
-        match_data = match.iloc[0]
-        return {
-            "match_id": int(match_data["match_id"]),
-            "home_team": match_data["home_team"],
-            "away_team": match_data["away_team"],
-            "home_score": int(match_data["home_score"]),
-            "away_score": int(match_data["away_score"]),
-            "competition": match_data["competition"],
-            "competition_stage": match_data["competition_stage"],
-            "stadium": match_data["stadium"],
-            "referee": match_data["referee"],
-            "home_managers": match_data["home_managers"],
-            "away_managers": match_data["away_managers"],
-            "season": match_data["season"],
-            "match_date": match_data["match_date"],
-            "kick_off": match_data["kick_off"],
-        }
+        return await resumo_partida(match_id, competition_id, season_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter resumo da partida: {str(e)}")
 
+@app.post("/match_summary/batch", response_model=MatchSummaryBatchResponse)
+async def match_summary_batch(pedido: MatchSummaryBatchRequest):
+    async def item(match_id):
+        try:
+            # Validado aqui, item a item: um campo inválido vira o erro deste item, não um 500 do lote inteiro.
+            resumo = MatchSummaryResponse.model_validate(await resumo_partida(match_id, pedido.competition_id, pedido.season_id))
+            return {"match_id": match_id, "summary": resumo}
+        except Exception as e:
+            return {"match_id": match_id, "error": mensagem_erro(e)}
+
+    return {"results": await asyncio.gather(*[item(match_id) for match_id in pedido.match_ids])}
+
 @app.get("/player_profile", response_model=PlayerProfileResponse)
 async def player_profile(
     match_id: int = Query(..., description="ID da partida"),
     player_id: int = Query(..., description="ID do jogador")
 ):
     try:
-        events = sb.events(match_id=match_id)
-
-        player_events = events[events["player_id"] == player_id]
-        if player_events.empty:
-            raise HTTPException(status_code=404, detail="Jogador não encontrado na partida")
-        
-        passes = len(player_events[player_events["type"] == "Pass"])
-        shots = len(player_events[player_events["type"] == "Shot"])
-        tackles = len(player_events[player_events["type"] == "Tackle"])
-        minutes_played = player_events["minute"].max() - player_events["minute"].min()
-
-        player_name = player_events.iloc[0]["player"]
-        return {
-            "player_id": player_id,
-            "player_name": player_name,
-            "passes": passes,
-            "shots": shots,
-            "tackles": tackles,
-            "minutes_played": minutes_played,
-        }
+        return await perfil_jogador(match_id, player_id)
     except KeyError as e:
         raise HTTPException(status_code=500, detail=f"Chave inválida: {e}")
 
+@app.post("/player_profile/batch", response_model=PlayerProfileBatchResponse)
+async def player_profile_batch(pedido: PlayerProfileBatchRequest):
+    async def item(player_id):
+        try:
+            return {"player_id": player_id, "profile": PlayerProfileResponse.model_validate(await perfil_jogador(pedido.match_id, player_id))}
+        except Exception as e:
+            return {"player_id": player_id, "error": mensagem_erro(e)}
+
+    return {"match_id": pedido.match_id, "results": await asyncio.gather(*[item(player_id) for player_id in pedido.player_ids])}
+
 @app.get("/team_events", response_model=TeamEventsNarrationResponse)
 async def team_events(
     match_id: int = Query(..., description="ID da partida"),
-    narration_style: int = Query(1, description="Estilo da narração: 1-Formal, 2-Humorístico, 3-Técnico")
+    narration_style: int = Query(1, description="Estilo da narração: 1-Formal, 2-Humorístico, 3-Técnico"),
+    force_refresh: bool = Query(False, description="Gera a narração de novo, ignorando o cache")
 ):
     try:
-        eventos = sb_eventos_partida(match_id)
-        eventos_agrupados = identificar_eventos_por_time(eventos)
-        team_events_summary = []
-
-        for team, data in eventos_agrupados.items():
-            team_events_summary.append({
-                "team": team,
-                "goals": sum(data["gols"]),
-                "goal_scorers": list(data["jogadores_gols"]),
-                "goal_count_per_player": data["gols"].to_dict(),
-                "assists": sum(data["assistencias"]),
-                "assist_providers": list(data["jogadores_assistencias"]),
-                "yellow_cards": data["cartoes_amarelos"],
-                "red_cards": data["cartoes_vermelhos"],
-                "tackles": data["desarmes_totais"],
-            })
-
-        estilos_narracao = ["formal", "humorística", "técnica"]
-        estilo_selecionado = estilos_narracao[narration_style - 1]
-        
-        genai.configure(api_key=os.environ["GEMINI_KEY"])
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
-        prompt = f"Resumo dos eventos: {team_events_summary}. Narre de forma {estilo_selecionado} os eventos da partida."
-        response = model.generate_content(prompt)
+        dados = await carregar_dados_partida(match_id)
+        team_events_summary = await chamadas.executar(("resumo", match_id), resumo_eventos_por_time, dados["eventos"])
+
+        estilo_selecionado = ESTILOS_NARRACAO[narration_style - 1]
+
+        narracao = await chamadas.executar(("narracao", match_id, narration_style, force_refresh), gerar_narracao, team_events_summary, estilo_selecionado, force_refresh)
 
         return {
             "events_summary": team_events_summary,
-            "narration": response.text
+            "narration": narracao
+        }
+
+    except LLMIndisponivel as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao processar eventos da partida: {str(e)}")
+
+@app.get("/team_events/stream")
+async def team_events_stream(
+    match_id: int = Query(..., description="ID da partida"),
+    narration_style: int = Query(1, description="Estilo da narração: 1-Formal, 2-Humorístico, 3-Técnico"),
+    force_refresh: bool = Query(False, description="Gera a narração de novo, ignorando o cache")
+):
+    """Server-Sent Events: 'summary' com o resumo dos times, 'token' a cada trecho da narração e 'done' no fim."""
+    try:
+        dados = await carregar_dados_partida(match_id)
+        team_events_summary = await chamadas.executar(("resumo", match_id), resumo_eventos_por_time, dados["eventos"])
+        estilo_selecionado = ESTILOS_NARRACAO[narration_style - 1]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao processar eventos da partida: {str(e)}")
+
+    prompt = prompt_narracao(team_events_summary, estilo_selecionado)
+
+    async def eventos():
+        yield evento_sse("summary", team_events_summary)
+        llm = cliente_llm()
+        narracao = None if force_refresh else await em_thread(cache_narracoes.obter, llm.modelo, prompt, estilo_selecionado)
+        if narracao is not None:
+            yield evento_sse("token", {"text": narracao})
+            yield evento_sse("done", {"narration": narracao, "cached": True})
+            return
+
+        partes = []
+        inicio = time.perf_counter()
+        try:
+            async for parte in iterar_em_thread(llm.gerar_em_partes(prompt)):
+                partes.append(parte)
+                yield evento_sse("token", {"text": parte})
+        except Exception as e:
+            yield evento_sse("error", {"detail": f"Erro ao gerar narração: {str(e)}"})
+            return
+        finally:
+            # Os cabeçalhos (Server-Timing) já saíram; o tempo do LLM vai só para o histograma.
+            metricas.registrar_etapa("llm", time.perf_counter() - inicio)
+        narracao = "".join(partes)
+        await em_thread(cache_narracoes.guardar, llm.modelo, prompt, estilo_selecionado, narracao)
+        yield evento_sse("done", {"narration": narracao, "cached": False})
+
+    return StreamingResponse(eventos(), media_type="text/event-stream", headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
+@app.websocket("/ws/live/{match_id}")
+async def live_match(websocket: WebSocket, match_id: int, speed: float = Query(60.0, ge=0, description="Segundos de jogo por segundo real (0 = sem espera)")):
+    """Reproduz os eventos salvos da partida como um feed ao vivo. Envia 'update' com o resumo dos times
+    (mesmo formato do /team_events) a cada gol, cartão, duelo, interceptação ou falha de recuperação,
+    e 'done' com o resumo final."""
+    from comum.ao_vivo import AgregadorAoVivo, reproduzir
+    await websocket.accept()
+    try:
+        dados = await carregar_dados_partida(match_id)
+    except Exception as e:
+        await websocket.send_json({"type": "error", "detail": f"Erro ao carregar eventos da partida: {str(e)}"})
+        await websocket.close(code=1011)
+        return
+
+    agregador = AgregadorAoVivo()
+    try:
+        async for evento in reproduzir(dados["eventos"], speed):
+            if agregador.atualizar(evento):
+                await websocket.send_json({
+                    "type": "update", "period": evento.get("period"), "minute": evento.get("minute"),
+                    "second": evento.get("second"), "events": agregador.eventos, "summary": formatar_resumo(agregador.resumo()),
+                })
+        await websocket.send_json({"type": "done", "events": agregador.eventos, "summary": formatar_resumo(agregador.resumo())})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/season_leaderboard", response_model=SeasonLeaderboardResponse)
+async def season_leaderboard(
+    response: Response,
+    competition_id: int = Query(..., description="ID da competição"),
+    season_id: int = Query(..., description="ID da temporada"),
+    top: int = Query(10, description="Quantidade de posições em cada ranking")
+):
+    from comum.temporada import agregar_temporada, classificacoes
+    try:
+        workers = int(os.environ["TEMPORADA_WORKERS"]) if "TEMPORADA_WORKERS" in os.environ else None
+        resultado = await chamadas.executar(("temporada_agregada", competition_id, season_id), agregar_temporada, competition_id, season_id, workers)
+        if resultado["partidas_com_erro"]:
+            response.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE_PARCIAL}"
+        rankings = classificacoes(resultado, top)
+        return {
+            "competition_id": competition_id,
+            "season_id": season_id,
+            "matches": resultado["partidas"],
+            "failed_matches": resultado["partidas_com_erro"],
+            "teams": rankings["times"],
+            "players": rankings["jogadores"],
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao agregar a temporada: {str(e)}")
+
+@app.get("/spatial/heatmap", response_model=HeatmapResponse)
+async def spatial_heatmap(
+    match_id: int = Query(..., description="ID da partida"),
+    group_by: str = Query("team", pattern="^(team|player)$", description="team ou player"),
+    type: list[str] | None = Query(None, description="Só ações destes tipos (Pass, Shot...)"),
+    bins_x: int = Query(12, ge=1, le=120, description="Caixas ao longo do comprimento (120)"),
+    bins_y: int = Query(8, ge=1, le=80, description="Caixas ao longo da largura (80)")
+):
+    """Mapa de calor das ações (localizacao_x/y) por time ou jogador: contagem por caixa do campo."""
+    from comum import espacial
+    try:
+        dados = await carregar_dados_partida(match_id)
+        tipos = tuple(sorted(type or []))
+        mapas = await analise_espacial(("mapa", match_id, group_by, bins_x, bins_y, tipos), mapas_calor, dados["eventos"], group_by, (bins_x, bins_y), tipos)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao montar o mapa de calor: {str(e)}")
+    return {"match_id": match_id, "group_by": group_by, "bins": [bins_x, bins_y],
+            "pitch": [espacial.COMPRIMENTO, espacial.LARGURA], "heatmaps": mapas}
+
+@app.get("/spatial/zones", response_model=ZonesResponse)
+async def spatial_zones(
+    match_id: int = Query(..., description="ID da partida"),
+    group_by: str = Query("team", pattern="^(team|player)$", description="team ou player"),
+    type: list[str] | None = Query(None, description="Só ações destes tipos (Pass, Shot...)")
+):
+    """Ações por terço do campo e por zona 3x3 (terço x corredor esquerdo/central/direito)."""
+    try:
+        dados = await carregar_dados_partida(match_id)
+        tipos = tuple(sorted(type or []))
+        resultado = await analise_espacial(("zonas", match_id, group_by, tipos), zonas, dados["eventos"], group_by, tipos)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao contar as zonas: {str(e)}")
+    return {"match_id": match_id, "group_by": group_by, "zones": resultado}
+
+@app.get("/spatial/pass_network", response_model=PassNetworkResponse)
+async def spatial_pass_network(
+    match_id: int = Query(..., description="ID da partida"),
+    team: str | None = Query(None, description="Time (padrão: os dois)"),
+    min_passes: int = Query(1, ge=1, description="Mínimo de passes para uma ligação aparecer")
+):
+    """Rede de passes completos: posição média de cada jogador e passes entre cada par passador -> recebedor."""
+    try:
+        dados = await carregar_dados_partida(match_id)
+        eventos = dados["eventos"]
+        times = [team] if team else [str(t) for t in eventos["team"].dropna().unique()]
+        redes = await analise_espacial(("rede", match_id, tuple(times), min_passes), redes_passes, eventos, times, min_passes)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao montar a rede de passes: {str(e)}")
+    return {"match_id": match_id, "networks": redes}
+
+@app.get("/events/export")
+async def events_export(
+    match_ids: list[int] = Query(..., max_length=500, description="IDs das partidas"),
+    format: str = Query("arrow", pattern="^(arrow|parquet)$", description="arrow (IPC stream) ou parquet"),
+    columns: list[str] | None = Query(None, description="Colunas a exportar (repetidas ou separadas por vírgula)"),
+    team: list[str] | None = Query(None, description="Só eventos destes times"),
+    type: list[str] | None = Query(None, description="Só eventos destes tipos (Pass, Shot...)"),
+    period: list[int] | None = Query(None, description="Só eventos destes períodos")
+):
+    """Eventos limpos (coordenadas separadas, tipos compactos) de uma ou mais partidas em Arrow IPC ou Parquet.
+    Filtros e seleção de colunas são aplicados antes da serialização; cada partida sai como um lote.
+    As partidas são carregadas uma de cada vez, enquanto a resposta é enviada: só uma fica em uso por vez."""
+    from comum import exportacao
+    colunas = [c.strip() for valor in columns or [] for c in valor.split(",") if c.strip()] or None
+    invalidas = exportacao.colunas_invalidas(colunas or [])
+    if invalidas:
+        raise HTTPException(status_code=400, detail=f"Colunas desconhecidas: {', '.join(invalidas)}")
+    schema = exportacao.esquema(colunas)
 
+    # A primeira partida é carregada antes da resposta começar, então um match_id inválido ainda vira um 500.
+    # Depois que os bytes começam a sair, uma falha interrompe o stream (o leitor acusa o arquivo incompleto).
+    try:
+        primeira = await carregar_dados_partida(match_ids[0])
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao processar eventos da partida: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erro ao carregar eventos das partidas: {str(e)}")
+
+    def serializar(exportador, eventos):
+        return exportador.escrever(exportacao.tabela(exportacao.filtrar(eventos, team, type, period), schema))
+
+    async def partes():
+        nonlocal primeira
+        exportador = exportacao.Exportador(format, schema)
+        for posicao, match_id in enumerate(match_ids):
+            dados = primeira if posicao == 0 else await carregar_dados_partida(match_id)
+            primeira = None
+            yield await em_thread(serializar, exportador, dados["eventos"])
+        yield exportador.fechar()
+
+    extensao = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(partes(), media_type=exportacao.FORMATOS[format],
+                             headers={"Content-Disposition": f'attachment; filename="eventos.{extensao}"'})
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas no formato texto do Prometheus: histogramas por rota e etapa, acertos dos caches e erros do StatsBomb/LLM."""
+    return PlainTextResponse(metricas.texto_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Registrado por último (depois das rotas e do cache_http), então fica por fora de tudo: mede também as
+# respostas 304 e as servidas do cache. Caminhos que não são rotas entram como "outras" no rótulo.
+ROTAS_CONHECIDAS = {rota.path for rota in app.routes}
+
+@app.middleware("http")
+async def metricas_http(request: Request, call_next):
+    rota = request.url.path if request.url.path in ROTAS_CONHECIDAS else "outras"
+    inicio = time.perf_counter()
+    tokens = metricas.iniciar_requisicao(rota)
+    try:
+        resposta = await call_next(request)
+    except Exception:
+        metricas.duracao_requisicoes.observar(time.perf_counter() - inicio, rota, "500")
+        raise
+    finally:
+        tempos = metricas.encerrar_requisicao(tokens)
+    total = time.perf_counter() - inicio
+    metricas.duracao_requisicoes.observar(total, rota, str(resposta.status_code))
+    resposta.headers["Server-Timing"] = metricas.server_timing(tempos, total)
+    return resposta
+
+# Perfil sob demanda: só existe se PERFIL_TOKEN estiver definido (sem ele o middleware nem é registrado).
+# Um pedido com o cabeçalho X-Profile: <token> ou ?profile=<token> roda com o AmostradorPilhas e o perfil
+# (formato collapsed, para flame graph) é salvo em PERFIL_DIR; o nome do arquivo volta em X-Profile-File.
+PERFIL_TOKEN = os.environ.get("PERFIL_TOKEN")
+
+if PERFIL_TOKEN:
+    from comum import perfilador
+
+    @app.middleware("http")
+    async def perfil_http(request: Request, call_next):
+        token = request.headers.get("x-profile") or request.query_params.get("profile")
+        if token is None:
+            return await call_next(request)
+        if not perfilador.token_confere(token, PERFIL_TOKEN):
+            return PlainTextResponse("Token de perfil inválido", status_code=403)
+
+        with perfilador.AmostradorPilhas(float(os.environ.get("PERFIL_INTERVALO", "0.001"))) as amostrador:
+            resposta = await call_next(request)
+        nome = await em_thread(perfilador.salvar_perfil, amostrador, request.url.path)
+        resposta.headers["X-Profile-File"] = nome
+        resposta.headers["X-Profile-Samples"] = str(amostrador.amostras)
+        return resposta
@@ -0,0 +1,103 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum.agregacao import identificar_eventos_por_time
+from sintetico import gerar_eventos
+
+
+def identificar_eventos_por_time_original(eventos_df):
+    # Versão que existia copiada em API_FAST, data e streamlit, mantida aqui como referência.
+    times = eventos_df['team'].unique()
+    eventos_times = {}
+
+    for time in times:
+        eventos_time = eventos_df[eventos_df['team'] == time]
+
+        gols = eventos_time[(eventos_time['type'] == 'Shot') & (eventos_time['shot_outcome'] == 'Goal')]
+        gols_por_jogador = gols.groupby('player').size()
+
+        assistencias = eventos_time[eventos_time['pass_goal_assist'] == True]
+        assistencias_por_jogador = assistencias.groupby('player').size()
+
+        passes = eventos_time[eventos_time['type'] == 'Pass']
+        passes_por_jogador = passes.groupby('player').size()
+
+        finalizacoes = eventos_time[eventos_time['type'] == 'Shot']
+        finalizacoes_por_jogador = finalizacoes.groupby('player').size()
+
+        cartoes_amarelos = eventos_time[
+            (eventos_time['bad_behaviour_card'] == 'Yellow Card') | (eventos_time['foul_committed_card'] == 'Yellow Card')
+        ]
+        cartoes_vermelhos = eventos_time[
+            (eventos_time['bad_behaviour_card'] == 'Red Card') | (eventos_time['foul_committed_card'] == 'Red Card')
+        ]
+
+        desarmes = eventos_time[eventos_time['type'] == 'Duel']
+        duelos_ganhos = desarmes[desarmes['duel_outcome'] == 'Won'] if 'duel_outcome' in desarmes.columns else desarmes
+        interceptacoes = eventos_time[eventos_time['type'] == 'Interception']
+        interceptacoes_bem_sucedidas = interceptacoes[interceptacoes['interception_outcome'] == 'Won'] if 'interception_outcome' in interceptacoes.columns else interceptacoes
+        recuperacoes_bola = eventos_time[eventos_time['type'] == 'Ball Recovery']
+        falhas_recuperacao = recuperacoes_bola[recuperacoes_bola['ball_recovery_recovery_failure'] == True] if 'ball_recovery_recovery_failure' in recuperacoes_bola.columns else None
+
+        eventos_times[time] = {
+            "gols": gols_por_jogador,
+            "jogadores_gols": gols['player'].unique(),
+            "assistencias": assistencias_por_jogador,
+            "jogadores_assistencias": assistencias['player'].unique(),
+            "passes": passes_por_jogador,
+            "finalizacoes": finalizacoes_por_jogador,
+            "cartoes_amarelos": len(cartoes_amarelos),
+            "cartoes_vermelhos": len(cartoes_vermelhos),
+            "desarmes_totais": len(desarmes),
+            "duelos_ganhos": len(duelos_ganhos),
+            "interceptacoes_bem_sucedidas": len(interceptacoes_bem_sucedidas),
+            "falhas_recuperacao_bola": len(falhas_recuperacao) if falhas_recuperacao is not None else 0
+        }
+    return eventos_times
+
+
+def conferir(esperado, obtido):
+    assert list(esperado) == list(obtido), "times diferentes"
+    for time, dados in esperado.items():
+        for chave, valor in dados.items():
+            novo = obtido[time][chave]
+            if isinstance(valor, pd.Series):
+                pd.testing.assert_series_equal(valor, novo, check_index_type=False)
+            elif isinstance(valor, np.ndarray):
+                assert list(valor) == list(novo), f"{time}/{chave}"
+            else:
+                assert valor == novo, f"{time}/{chave}: {valor} != {novo}"
+
+
+def medir(funcao, eventos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(eventos)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a agregação por time original com a vetorizada.")
+    parser.add_argument("--partidas", type=int, nargs="+", default=[1, 10, 380])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'partidas':>8} {'eventos':>10} {'original (s)':>13} {'vetorizada (s)':>15} {'ganho':>7}")
+    for partidas in args.partidas:
+        eventos = gerar_eventos(partidas=partidas)
+        tempo_original, esperado = medir(identificar_eventos_por_time_original, eventos, args.repeticoes)
+        tempo_novo, obtido = medir(identificar_eventos_por_time, eventos, args.repeticoes)
+        conferir(esperado, obtido)
+        print(f"{partidas:>8} {len(eventos):>10} {tempo_original:>13.4f} {tempo_novo:>15.4f} {tempo_original / tempo_novo:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum.agregacao import identificar_eventos_por_time
+from comum.compactacao import compactar, relatorio
+from comum.eventos import extrair_coordenadas
+from sintetico import gerar_eventos
+from bench_agregacao import conferir
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao(*args)
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e tempo de agregação dos eventos antes e depois da compactação.")
+    parser.add_argument("--partidas", type=int, nargs="+", default=[1, 10, 380])
+    args = parser.parse_args()
+
+    print(f"{'partidas':>8} {'antes (MB)':>11} {'depois (MB)':>12} {'redução':>8} {'compactar (s)':>14} {'agreg. antes (s)':>17} {'agreg. depois (s)':>18}")
+    for partidas in args.partidas:
+        brutos = gerar_eventos(partidas=partidas)
+        eventos = extrair_coordenadas(brutos.copy())
+        tempo_compactar, compactos = cronometrar(compactar, eventos, repeticoes=1)
+        tempo_antes, esperado = cronometrar(identificar_eventos_por_time, eventos)
+        tempo_depois, obtido = cronometrar(identificar_eventos_por_time, compactos)
+        conferir(esperado, obtido)
+
+        r = relatorio(brutos, compactos)
+        print(f"{partidas:>8} {r['bytes_antes'] / 1e6:>11.1f} {r['bytes_depois'] / 1e6:>12.1f} {r['reducao']:>7.1f}x "
+              f"{tempo_compactar:>14.3f} {tempo_antes:>17.3f} {tempo_depois:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
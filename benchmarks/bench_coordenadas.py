@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum.eventos import extrair_coordenadas
+from sintetico import gerar_eventos
+
+
+def extrair_coordenadas_original(eventos):
+    # Versão que existia em sb_eventos_partida: apply linha a linha e descarte dos eventos sem localização.
+    eventos_validos = eventos[eventos['location'].apply(lambda x: isinstance(x, list) and len(x) == 2)]
+    if not eventos_validos.empty:
+        eventos_validos.loc[:, ['localizacao_x', 'localizacao_y']] = pd.DataFrame(eventos_validos['location'].tolist(), index=eventos_validos.index)
+        eventos = eventos_validos
+    return eventos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a extração de coordenadas original com a vetorizada.")
+    parser.add_argument("--partidas", type=int, nargs="+", default=[1, 10, 380])
+    args = parser.parse_args()
+
+    print(f"{'partidas':>8} {'eventos':>10} {'original (s)':>13} {'vetorizada (s)':>15} {'descartados antes':>18}")
+    for partidas in args.partidas:
+        eventos = gerar_eventos(partidas=partidas)
+
+        inicio = time.perf_counter()
+        original = extrair_coordenadas_original(eventos.copy())
+        tempo_original = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        novo = extrair_coordenadas(eventos)
+        tempo_novo = time.perf_counter() - inicio
+
+        assert len(novo) == len(eventos)
+        print(f"{partidas:>8} {len(eventos):>10} {tempo_original:>13.4f} {tempo_novo:>15.4f} {len(eventos) - len(original):>18}")
+
+
+if __name__ == "__main__":
+    main()
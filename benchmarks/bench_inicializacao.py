@@ -0,0 +1,83 @@
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Alvo -> (pasta de onde é importado, módulo). As páginas do streamlit rodam em "bare mode" (sem servidor):
+# o script da página executa com os widgets nos valores padrão, que é o que um worker novo paga ao abri-la.
+ALVOS = {
+    "api": ("API_FAST", "main"),
+    "lang_llm": ("streamlit", "lang_llm"),
+    "api_st": ("streamlit", "api_st"),
+    "main_st": ("streamlit", "main_st"),
+    "espacial_st": ("streamlit", "espacial_st"),
+    "narracao_personalizada_st": ("streamlit", "narracao_personalizada_st"),
+}
+# Orçamento do import a frio, em ms, com folga sobre o medido numa máquina de desenvolvimento.
+ORCAMENTOS_MS = {"api": 400, "lang_llm": 800, "api_st": 300, "main_st": 800, "espacial_st": 1400,
+                 "narracao_personalizada_st": 900}
+
+_MEDIR = "import time; inicio = time.perf_counter(); import {modulo}; print(time.perf_counter() - inicio)"
+
+
+def _rodar(alvo, codigo, *opcoes):
+    pasta, _ = ALVOS[alvo]
+    ambiente = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    ambiente.setdefault("GEMINI_KEY", "sem-chave")
+    return subprocess.run([sys.executable, *opcoes, "-c", codigo], cwd=os.path.join(RAIZ, pasta), env=ambiente,
+                          capture_output=True, text=True, check=True)
+
+
+def tempo_importacao(alvo, repeticoes=5):
+    """Melhor tempo (s) do import do alvo, cada vez num processo novo."""
+    _, modulo = ALVOS[alvo]
+    return min(float(_rodar(alvo, _MEDIR.format(modulo=modulo)).stdout.strip().splitlines()[-1]) for _ in range(repeticoes))
+
+
+def detalhamento(alvo):
+    """Tempo próprio (s) de cada pacote de primeiro nível no import do alvo, pelo -X importtime."""
+    _, modulo = ALVOS[alvo]
+    saida = _rodar(alvo, f"import {modulo}", "-X", "importtime").stderr
+    pacotes = defaultdict(float)
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, nome = linha[len("import time:"):].split("|")
+        pacotes[nome.strip().split(".")[0]] += int(proprio) / 1e6
+    return sorted(pacotes.items(), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização a frio da API e das páginas do streamlit, "
+                                                 "com o detalhamento por pacote e a checagem do orçamento.")
+    parser.add_argument("alvos", nargs="*", default=list(ALVOS), help=f"padrão: todos ({', '.join(ALVOS)})")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="pacotes mostrados no detalhamento de cada alvo")
+    parser.add_argument("--orcamento", nargs="*", default=[], metavar="ALVO=MS", help="troca o orçamento de um alvo, ex.: api=300")
+    args = parser.parse_args()
+    desconhecidos = set(args.alvos) - set(ALVOS)
+    if desconhecidos:
+        parser.error(f"alvos desconhecidos: {', '.join(sorted(desconhecidos))}")
+    orcamentos = {**ORCAMENTOS_MS, **{alvo: float(ms) for alvo, ms in (item.split("=") for item in args.orcamento)}}
+
+    estouros = []
+    for alvo in args.alvos:
+        milissegundos = tempo_importacao(alvo, args.repeticoes) * 1000
+        print(f"{alvo}: {milissegundos:.0f} ms (orçamento {orcamentos[alvo]:.0f} ms)")
+        for pacote, segundos in detalhamento(alvo)[:args.top]:
+            print(f"    {pacote:<28} {segundos * 1000:>8.1f} ms")
+        if milissegundos > orcamentos[alvo]:
+            estouros.append(f"{alvo}: {milissegundos:.0f} ms > {orcamentos[alvo]:.0f} ms")
+
+    for estouro in estouros:
+        print(f"ACIMA DO ORÇAMENTO {estouro}")
+    if estouros:
+        sys.exit(1)
+    print("inicialização dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
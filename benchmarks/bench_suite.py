@@ -0,0 +1,233 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, "API_FAST"))
+
+# Gemini falso (comum/llm.py), sem limite de taxa, e narrações num SQLite temporário: nada sai da máquina
+# e o tempo medido é o do nosso código, não o da espera pelo limite de requisições por minuto.
+_TEMPORARIO = tempfile.mkdtemp(prefix="bench_suite_")
+os.environ.update({"LLM_FALSO": "1", "LLM_FALSO_ATRASO": "0", "LLM_REQUISICOES_POR_MINUTO": "1000000",
+                   "NARRACOES_CACHE_PATH": os.path.join(_TEMPORARIO, "narracoes.sqlite")})
+
+from comum import armazenamento, espacial
+from comum.agregacao import identificar_eventos_por_time
+from comum.eventos import sb_eventos_partida
+from comum.jogadores import estatisticas_jogadores, estatisticas_por_nome
+from sintetico import gerar_eventos, gerar_partidas
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+COMPETICAO, TEMPORADA = 1, 1
+
+
+class StatsBombFalso:
+    """Troca o download/leitura do armazenamento por partidas sintéticas em memória."""
+
+    def __init__(self, partidas):
+        brutos = gerar_eventos(partidas=partidas)
+        self.eventos = {int(m): e.reset_index(drop=True) for m, e in brutos.groupby("match_id", sort=True)}
+        self.partidas = gerar_partidas(brutos, COMPETICAO, TEMPORADA)
+        armazenamento.carregar_eventos = lambda match_id: self.eventos[int(match_id)].copy()
+        armazenamento.carregar_partidas = lambda competition_id, season_id: self.partidas.copy()
+
+
+def etapa_carregar(sb):
+    return [sb_eventos_partida(match_id) for match_id in sb.eventos]
+
+
+def etapa_agregar(compactos):
+    return identificar_eventos_por_time(pd.concat(compactos, ignore_index=True))
+
+
+def etapa_espacial(eventos):
+    # Temporada inteira já concatenada: mede só o binning (mapa por jogador) e as zonas por time.
+    return espacial.mapa_calor(eventos, "player"), espacial.contagem_zonas(eventos, "team")
+
+
+def etapa_perfis(compactos):
+    # O que o streamlit/main_st.py calcula para display_player_profile e compare_players (sem desenhar).
+    comparacoes = []
+    for eventos in compactos:
+        estatisticas = estatisticas_por_nome(estatisticas_jogadores(eventos))
+        nomes = sorted(estatisticas)
+        comparacoes.append({nome: {m: estatisticas[nome][m] for m in ["passes", "shots", "goals", "tackles"]}
+                            for nome in nomes[:2]})
+    return comparacoes
+
+
+def preparar_api():
+    from fastapi.testclient import TestClient
+    from comum.cache import CachePartidas
+    from comum.cache_narracoes import CacheNarracoes
+    import main
+
+    def rodar(sb):
+        # Caches zerados a cada rodada: mede o caminho frio (carregar, agregar, narrar) de cada partida.
+        main.cache_dados.limpar()
+        main.respostas_http.limpar()
+        main.cache_partidas = CachePartidas()
+        main.cache_narracoes = CacheNarracoes(tempfile.mktemp(dir=_TEMPORARIO, suffix=".sqlite"))
+        cliente = TestClient(main.app)
+        for match_id, eventos in sb.eventos.items():
+            player_id = int(eventos["player_id"].dropna().iloc[0])
+            for rota, parametros in [
+                ("/match_summary", {"competition_id": COMPETICAO, "season_id": TEMPORADA, "match_id": match_id}),
+                ("/player_profile", {"match_id": match_id, "player_id": player_id}),
+                ("/team_events", {"match_id": match_id, "narration_style": 1}),
+            ]:
+                resposta = cliente.get(rota, params=parametros)
+                if resposta.status_code != 200:
+                    raise RuntimeError(f"{rota} {match_id}: {resposta.status_code} {resposta.text}")
+    return rodar
+
+
+def medir_tempo(funcao, argumento, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao(argumento)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def medir_pico(funcao, argumento):
+    """Pico de memória alocada pelo Python durante a etapa (rodada separada, o tracemalloc deixa tudo mais lento)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao(argumento)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def calibrar(repeticoes=10):
+    """Tempo (s) de uma carga fixa parecida com a das etapas (laço em Python e groupby do pandas), medido
+    no mesmo processo. É a unidade usada para comparar tempos de máquinas, ou momentos, diferentes."""
+    tabela = pd.DataFrame({"grupo": np.arange(1_000_000) % 500, "valor": np.linspace(0, 1, 1_000_000)})
+
+    def carga(_):
+        total = sum(i % 7 for i in range(1_000_000))
+        return total, tabela.groupby("grupo")["valor"].agg(["sum", "count"])
+    return medir_tempo(carga, None, repeticoes)[0]
+
+
+def nome_processador():
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("model name"):
+                    return linha.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def maquina():
+    """O que identifica a máquina/ambiente do baseline: com outra, os tempos só servem de aviso."""
+    return {"sistema": platform.system(), "arquitetura": platform.machine(), "processador": nome_processador(),
+            "nucleos": os.cpu_count(), "python": platform.python_version(), "pandas": pd.__version__}
+
+
+def rodar_escala(partidas, repeticoes, com_api):
+    sb = StatsBombFalso(partidas)
+    resultados = {}
+
+    def registrar(nome, funcao, argumento):
+        segundos, saida = medir_tempo(funcao, argumento, repeticoes)
+        resultados[nome] = {"segundos": round(segundos, 4), "pico_mb": round(medir_pico(funcao, argumento) / 1e6, 2)}
+        return saida
+
+    compactos = registrar("sb_eventos_partida", etapa_carregar, sb)
+    registrar("identificar_eventos_por_time", etapa_agregar, compactos)
+    registrar("perfis_streamlit", etapa_perfis, compactos)
+    registrar("mapas_espaciais", etapa_espacial, pd.concat(compactos, ignore_index=True))
+    if com_api:
+        registrar("api_endpoints", preparar_api(), sb)
+    return resultados
+
+
+def comparar(atual, baseline, tolerancia, minimo_segundos, fator=1.0):
+    """Lista as regressões de tempo e de memória em relação ao baseline, além da tolerância.
+
+    Os tempos do baseline são multiplicados por `fator` (calibração atual / calibração do baseline) antes
+    da comparação. Diferenças de tempo abaixo de `minimo_segundos` são ignoradas (ruído de medição).
+    Devolve (regressões de tempo, regressões de memória)."""
+    tempo, memoria = [], []
+    for escala, etapas in atual.items():
+        for etapa, medida in etapas.items():
+            base = baseline.get(escala, {}).get(etapa)
+            if base is None:
+                continue
+            esperado = base["segundos"] * fator
+            if medida["segundos"] > esperado * (1 + tolerancia) and medida["segundos"] - esperado > minimo_segundos:
+                tempo.append(f"{escala} partidas / {etapa}: {medida['segundos']:.3f}s (baseline {esperado:.3f}s)")
+            if medida["pico_mb"] > base["pico_mb"] * (1 + tolerancia):
+                memoria.append(f"{escala} partidas / {etapa}: {medida['pico_mb']:.1f} MB (baseline {base['pico_mb']:.1f} MB)")
+    return tempo, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo e pico de memória de cada etapa (eventos, agregação, perfis e API) com StatsBomb e Gemini falsos.")
+    parser.add_argument("--partidas", type=int, nargs="+", default=[1, 10, 380])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--sem-api", action="store_true", help="não mede os endpoints da API_FAST")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento aceito antes de acusar regressão (padrão: 25%%)")
+    parser.add_argument("--minimo-segundos", type=float, default=0.005)
+    parser.add_argument("--estrito", action="store_true",
+                        help="acusa regressão de tempo mesmo com um baseline gravado em outra máquina")
+    args = parser.parse_args()
+
+    calibracao = calibrar()
+    print(f"calibração: {calibracao:.4f}s")
+    atual = {}
+    print(f"{'partidas':>8} {'etapa':<30} {'tempo (s)':>10} {'pico (MB)':>10}")
+    for partidas in args.partidas:
+        atual[str(partidas)] = rodar_escala(partidas, args.repeticoes, not args.sem_api)
+        for etapa, medida in atual[str(partidas)].items():
+            print(f"{partidas:>8} {etapa:<30} {medida['segundos']:>10.4f} {medida['pico_mb']:>10.1f}")
+
+    if args.salvar_baseline:
+        armazenamento.salvar_json({"maquina": maquina(), "calibracao_segundos": round(calibracao, 4), "escalas": atual}, args.baseline)
+        print(f"baseline salvo em {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("sem baseline para comparar; rode com --salvar-baseline")
+        return
+    with open(args.baseline, encoding="utf-8") as arquivo:
+        baseline = json.load(arquivo)
+    fator = calibracao / baseline["calibracao_segundos"]
+    print(f"tempos do baseline multiplicados por {fator:.2f} (calibração {baseline['calibracao_segundos']:.4f}s no baseline)")
+    regressoes_tempo, regressoes_memoria = comparar(atual, baseline["escalas"], args.tolerancia, args.minimo_segundos, fator)
+
+    # A calibração corrige a velocidade geral, mas não a proporção entre Python, pandas e memória de cada
+    # máquina: com um baseline de outra máquina, as diferenças de tempo só viram aviso.
+    mesma_maquina = baseline["maquina"] == maquina()
+    if not mesma_maquina:
+        print("baseline gravado em outra máquina; grave um local com --salvar-baseline")
+    for regressao in regressoes_tempo:
+        print(f"{'REGRESSÃO' if mesma_maquina or args.estrito else 'AVISO'} {regressao}")
+    for regressao in regressoes_memoria:
+        print(f"REGRESSÃO {regressao}")
+    if regressoes_memoria or (regressoes_tempo and (mesma_maquina or args.estrito)):
+        sys.exit(1)
+    print("só avisos de tempo, sem regressões" if regressoes_tempo else "sem regressões em relação ao baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+TIPOS = ["Pass", "Carry", "Pressure", "Ball Receipt*", "Duel", "Shot", "Interception",
+         "Ball Recovery", "Foul Committed", "Bad Behaviour", "Clearance", "Dribble"]
+PESOS = [0.30, 0.24, 0.12, 0.16, 0.05, 0.01, 0.02, 0.04, 0.015, 0.002, 0.02, 0.013]
+POSICOES = ["Goalkeeper", "Right Back", "Left Back", "Right Center Back", "Left Center Back",
+            "Center Defensive Midfield", "Right Center Midfield", "Left Center Midfield",
+            "Right Wing", "Left Wing", "Center Forward"]
+
+
+def _coordenadas(rng, n, ausentes):
+    x = np.round(rng.uniform(0, 120, n), 1)
+    y = np.round(rng.uniform(0, 80, n), 1)
+    return [np.nan if falta else [a, b] for a, b, falta in zip(x.tolist(), y.tolist(), ausentes)]
+
+
+def gerar_eventos(partidas=1, eventos_por_partida=3500, times=20, jogadores_por_time=16, semente=0):
+    """Gera um DataFrame no formato do sb.events com várias partidas concatenadas."""
+    rng = np.random.default_rng(semente)
+    n = partidas * eventos_por_partida
+
+    match_id = np.repeat(np.arange(partidas) + 1_000_000, eventos_por_partida)
+    mandante = rng.integers(0, times, partidas)
+    visitante = (mandante + rng.integers(1, times, partidas)) % times
+    lado = rng.integers(0, 2, n)
+    time_id = np.where(lado == 0, np.repeat(mandante, eventos_por_partida), np.repeat(visitante, eventos_por_partida))
+    jogador_id = time_id * 100 + rng.integers(0, jogadores_por_time, n)
+    recebedor_id = time_id * 100 + rng.integers(0, jogadores_por_time, n)
+
+    tipo = rng.choice(TIPOS, n, p=np.array(PESOS) / sum(PESOS))
+    sorteio = rng.random(n)
+    nomes_times = np.array([f"Time {i}" for i in range(times)], dtype=object)
+    nomes_jogadores = {i: f"Jogador {i}" for i in np.unique(np.concatenate([jogador_id, recebedor_id]))}
+
+    def onde(condicao, valores):
+        return pd.Series(np.where(condicao, valores, None), dtype=object).where(condicao, np.nan)
+
+    minuto = np.sort(rng.integers(0, 95, (partidas, eventos_por_partida)), axis=1).ravel()
+    segundo = rng.integers(0, 60, n)
+    eventos = pd.DataFrame({
+        "match_id": match_id,
+        "index": np.tile(np.arange(1, eventos_por_partida + 1), partidas),
+        "period": np.where(minuto < 45, 1, 2),
+        "minute": minuto,
+        "second": segundo,
+        "timestamp": [f"00:{m % 45:02d}:{s:02d}.000" for m, s in zip(minuto.tolist(), segundo.tolist())],
+        "type": tipo,
+        "team": nomes_times[time_id],
+        "team_id": time_id,
+        "possession_team": nomes_times[time_id],
+        "player": [nomes_jogadores[i] for i in jogador_id.tolist()],
+        "player_id": jogador_id.astype(float),
+        "position": np.array(POSICOES, dtype=object)[jogador_id % len(POSICOES)],
+        "play_pattern": "Regular Play",
+        "location": _coordenadas(rng, n, tipo == "Bad Behaviour"),
+        "pass_end_location": _coordenadas(rng, n, tipo != "Pass"),
+        "pass_recipient": onde(tipo == "Pass", [nomes_jogadores[i] for i in recebedor_id.tolist()]),
+        "pass_recipient_id": np.where(tipo == "Pass", recebedor_id, np.nan),
+        "pass_outcome": onde((tipo == "Pass") & (sorteio < 0.2), "Incomplete"),
+        "pass_goal_assist": onde((tipo == "Pass") & (sorteio > 0.998), True),
+        "shot_outcome": onde(tipo == "Shot", np.where(sorteio < 0.1, "Goal", np.where(sorteio < 0.5, "Saved", "Off T"))),
+        "shot_end_location": _coordenadas(rng, n, tipo != "Shot"),
+        "duel_type": onde(tipo == "Duel", "Tackle"),
+        "duel_outcome": onde((tipo == "Duel") & (sorteio < 0.6), np.where(sorteio < 0.3, "Won", "Lost In Play")),
+        "interception_outcome": onde(tipo == "Interception", np.where(sorteio < 0.5, "Won", "Lost")),
+        "ball_recovery_recovery_failure": onde((tipo == "Ball Recovery") & (sorteio < 0.2), True),
+        "foul_committed_card": onde((tipo == "Foul Committed") & (sorteio < 0.2), np.where(sorteio < 0.18, "Yellow Card", "Red Card")),
+        "bad_behaviour_card": onde(tipo == "Bad Behaviour", "Yellow Card"),
+    })
+    return eventos
+
+
+def gerar_partidas(eventos, competition_id=1, season_id=1):
+    """Tabela no formato do sb.matches para as partidas de um DataFrame gerado por gerar_eventos."""
+    linhas = []
+    for match_id, partida in eventos.groupby("match_id", sort=True):
+        times = list(dict.fromkeys(partida["team"]))
+        gols = partida[(partida["type"] == "Shot") & (partida["shot_outcome"] == "Goal")]["team"].value_counts()
+        mandante, visitante = times[0], times[-1]
+        linhas.append({
+            "match_id": int(match_id),
+            "competition_id": competition_id,
+            "season_id": season_id,
+            "home_team": mandante,
+            "away_team": visitante,
+            "home_score": int(gols.get(mandante, 0)),
+            "away_score": int(gols.get(visitante, 0)),
+            "competition": "Competição Sintética",
+            "competition_stage": "Regular Season",
+            "stadium": "Estádio Sintético",
+            "referee": "Árbitro Sintético",
+            "home_managers": "Técnico A",
+            "away_managers": "Técnico B",
+            "season": "2024",
+            "match_date": "2024-01-01",
+            "kick_off": "16:00:00.000",
+        })
+    return pd.DataFrame(linhas)
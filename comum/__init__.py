@@ -0,0 +1,4 @@
+import os
+
+# Fica aqui (e não no armazenamento) para que módulos leves possam usá-lo sem importar pandas/pyarrow/statsbombpy.
+DIRETORIO_RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
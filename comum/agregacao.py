@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+METRICAS_POR_JOGADOR = ["gols", "assistencias", "passes", "finalizacoes"]
+METRICAS_POR_TIME = ["cartoes_amarelos", "cartoes_vermelhos", "desarmes_totais", "duelos_ganhos",
+                     "interceptacoes_bem_sucedidas", "falhas_recuperacao_bola"]
+
+
+def _comparador(serie):
+    # Fatoriza a coluna uma vez; cada comparação passa a ser entre inteiros, não entre objetos.
+    codigos, valores = pd.factorize(serie)
+
+    def igual(valor):
+        return np.isin(codigos, np.flatnonzero(np.asarray(valores == valor, dtype=bool)))
+    return igual
+
+
+def _coluna_igual(eventos_df, coluna, valor):
+    if coluna not in eventos_df.columns:
+        return np.zeros(len(eventos_df), dtype=bool)
+    return _comparador(eventos_df[coluna])(valor)
+
+
+def _serie_vazia():
+    return pd.Series(dtype="int64", index=pd.Index([], name="player", dtype=object))
+
+
+def _jogadores_em_ordem(codigos, jogadores, mascara):
+    por_time = {}
+    for codigo, jogador in zip(codigos[mascara].tolist(), jogadores[mascara]):
+        por_time.setdefault(codigo, []).append(jogador)
+    return {codigo: pd.unique(np.array(nomes, dtype=object)) for codigo, nomes in por_time.items()}
+
+
+def indicadores_eventos(eventos_df):
+    """Marca, para cada evento, se ele é gol, assistência, passe, finalização, cartão, duelo,
+    interceptação bem-sucedida ou falha de recuperação (um array booleano por métrica)."""
+    tipo = _comparador(eventos_df["type"])
+    chutes = tipo("Shot")
+    duelos = tipo("Duel")
+    interceptacoes = tipo("Interception")
+    recuperacoes = tipo("Ball Recovery")
+
+    if "duel_outcome" in eventos_df.columns:
+        duelos_ganhos = duelos & _coluna_igual(eventos_df, "duel_outcome", "Won")
+    else:
+        duelos_ganhos = duelos
+    if "interception_outcome" in eventos_df.columns:
+        interceptacoes = interceptacoes & _coluna_igual(eventos_df, "interception_outcome", "Won")
+
+    vazio = np.zeros(len(eventos_df), dtype=bool)
+    cartoes = {"Yellow Card": vazio, "Red Card": vazio}
+    for coluna in ["bad_behaviour_card", "foul_committed_card"]:
+        if coluna in eventos_df.columns:
+            cartao = _comparador(eventos_df[coluna])
+            for cor in cartoes:
+                cartoes[cor] = cartoes[cor] | cartao(cor)
+
+    return {
+        "gols": chutes & _coluna_igual(eventos_df, "shot_outcome", "Goal"),
+        "assistencias": _coluna_igual(eventos_df, "pass_goal_assist", True),
+        "passes": tipo("Pass"),
+        "finalizacoes": chutes,
+        "cartoes_amarelos": cartoes["Yellow Card"],
+        "cartoes_vermelhos": cartoes["Red Card"],
+        "desarmes_totais": duelos,
+        "duelos_ganhos": duelos_ganhos,
+        "interceptacoes_bem_sucedidas": interceptacoes,
+        "falhas_recuperacao_bola": recuperacoes & _coluna_igual(eventos_df, "ball_recovery_recovery_failure", True),
+    }
+
+
+def contagens_por_jogador(eventos_df):
+    """Soma todos os indicadores por (team, player) em um único agrupamento."""
+    indicadores = pd.DataFrame(indicadores_eventos(eventos_df))
+    indicadores["team"] = eventos_df["team"].to_numpy(dtype=object)
+    indicadores["player"] = eventos_df["player"].to_numpy(dtype=object)
+    return indicadores.groupby(["team", "player"], observed=True).sum()
+
+
+def identificar_eventos_por_time(eventos_df):
+    """Conta gols, assistências, cartões, duelos, interceptações e recuperações por time
+    (e por jogador) com um único agrupamento sobre o DataFrame, sem filtrar cópias por time."""
+    codigos, times = pd.factorize(eventos_df["team"])
+    marcados = indicadores_eventos(eventos_df)
+    gols = marcados["gols"]
+    assistencias = marcados["assistencias"]
+    passes = marcados["passes"]
+    chutes = marcados["finalizacoes"]
+
+    indicadores = pd.DataFrame({metrica: marcados[metrica] for metrica in METRICAS_POR_TIME})
+    totais = indicadores.groupby(codigos, observed=True).sum().to_dict("index")
+
+    jogadores = eventos_df["player"].to_numpy(dtype=object)
+    relevantes = gols | assistencias | passes | chutes
+    por_jogador = pd.DataFrame({
+        "time": codigos[relevantes],
+        "player": jogadores[relevantes],
+        "gols": gols[relevantes],
+        "assistencias": assistencias[relevantes],
+        "passes": passes[relevantes],
+        "finalizacoes": chutes[relevantes],
+    }).groupby(["time", "player"], observed=True).sum()
+    grupos_jogadores = {codigo: grupo.droplevel(0) for codigo, grupo in por_jogador.groupby(level=0, observed=True)}
+    jogadores_gols = _jogadores_em_ordem(codigos, jogadores, gols)
+    jogadores_assistencias = _jogadores_em_ordem(codigos, jogadores, assistencias)
+    nenhum = np.array([], dtype=object)
+
+    eventos_times = {}
+    for codigo, time in enumerate(times):
+        grupo = grupos_jogadores.get(codigo)
+        contagens = {}
+        for metrica in METRICAS_POR_JOGADOR:
+            if grupo is None:
+                contagens[metrica] = _serie_vazia()
+                continue
+            serie = grupo[metrica]
+            serie = serie[serie > 0].astype("int64")
+            serie.name = None
+            contagens[metrica] = serie
+
+        linha = totais[codigo]
+        eventos_times[time] = {
+            "gols": contagens["gols"],
+            "jogadores_gols": jogadores_gols.get(codigo, nenhum),
+            "assistencias": contagens["assistencias"],
+            "jogadores_assistencias": jogadores_assistencias.get(codigo, nenhum),
+            "passes": contagens["passes"],
+            "finalizacoes": contagens["finalizacoes"],
+            "cartoes_amarelos": int(linha["cartoes_amarelos"]),
+            "cartoes_vermelhos": int(linha["cartoes_vermelhos"]),
+            "desarmes_totais": int(linha["desarmes_totais"]),
+            "duelos_ganhos": int(linha["duelos_ganhos"]),
+            "interceptacoes_bem_sucedidas": int(linha["interceptacoes_bem_sucedidas"]),
+            "falhas_recuperacao_bola": int(linha["falhas_recuperacao_bola"]),
+        }
+    return eventos_times
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from comum.agregacao import METRICAS_POR_JOGADOR
+
+_AUSENTE = object()
+_CARTOES = {"Yellow Card": "cartoes_amarelos", "Red Card": "cartoes_vermelhos"}
+
+
+def _ausente(valor):
+    return valor is _AUSENTE or valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor is pd.NA
+
+
+def _igual(valor, alvo):
+    if _ausente(valor):
+        return False
+    try:
+        return bool(valor == alvo)
+    except (TypeError, ValueError):
+        return False
+
+
+class AgregadorAoVivo:
+    """Versão incremental de identificar_eventos_por_time: cada evento atualiza contadores por time e
+    por jogador em O(1), e `resumo()` devolve exatamente o que a função em lote devolveria para todos
+    os eventos recebidos até ali (mesma ordem dos times, mesmos tipos e as mesmas regras de colunas
+    ausentes: sem duel_outcome/interception_outcome, todo duelo/interceptação conta)."""
+
+    def __init__(self):
+        self.eventos = 0
+        self.times = {}
+        self.colunas_resultado = set()
+
+    def _time(self, nome):
+        dados = self.times.get(nome)
+        if dados is None:
+            dados = self.times[nome] = {
+                "cartoes_amarelos": 0, "cartoes_vermelhos": 0, "desarmes_totais": 0, "duelos_vencidos": 0,
+                "interceptacoes": 0, "interceptacoes_vencidas": 0, "falhas_recuperacao_bola": 0,
+                "jogadores": {metrica: {} for metrica in METRICAS_POR_JOGADOR},
+                "jogadores_gols": {}, "jogadores_assistencias": {},
+            }
+        return dados
+
+    def atualizar(self, evento):
+        """Soma um evento (dict ou linha do DataFrame). Devolve True se algum total exibido mudou
+        (gols, assistências, cartões, duelos, interceptações ou falhas de recuperação)."""
+        self.eventos += 1
+        for coluna in ("duel_outcome", "interception_outcome"):
+            if coluna in evento:
+                self.colunas_resultado.add(coluna)
+
+        nome_time = evento.get("team", _AUSENTE)
+        if _ausente(nome_time):
+            return False
+        dados = self._time(nome_time)
+        tipo = evento.get("type", _AUSENTE)
+        jogador = evento.get("player", _AUSENTE)
+        jogador = np.nan if _ausente(jogador) else jogador
+        mudou = False
+
+        gol = _igual(tipo, "Shot") and _igual(evento.get("shot_outcome", _AUSENTE), "Goal")
+        assistencia = _igual(evento.get("pass_goal_assist", _AUSENTE), True)
+        marcados = {"gols": gol, "assistencias": assistencia, "passes": _igual(tipo, "Pass"), "finalizacoes": _igual(tipo, "Shot")}
+        for metrica, marcado in marcados.items():
+            if marcado and not _ausente(jogador):
+                contagens = dados["jogadores"][metrica]
+                contagens[jogador] = contagens.get(jogador, 0) + 1
+        if gol:
+            dados["jogadores_gols"].setdefault(jogador, None)
+        if assistencia:
+            dados["jogadores_assistencias"].setdefault(jogador, None)
+        mudou |= gol or assistencia
+
+        cores = {cor for coluna in ("bad_behaviour_card", "foul_committed_card")
+                 for cor in _CARTOES if _igual(evento.get(coluna, _AUSENTE), cor)}
+        for cor in cores:
+            dados[_CARTOES[cor]] += 1
+            mudou = True
+
+        if _igual(tipo, "Duel"):
+            dados["desarmes_totais"] += 1
+            dados["duelos_vencidos"] += _igual(evento.get("duel_outcome", _AUSENTE), "Won")
+            mudou = True
+        elif _igual(tipo, "Interception"):
+            dados["interceptacoes"] += 1
+            dados["interceptacoes_vencidas"] += _igual(evento.get("interception_outcome", _AUSENTE), "Won")
+            mudou = True
+        elif _igual(tipo, "Ball Recovery") and _igual(evento.get("ball_recovery_recovery_failure", _AUSENTE), True):
+            dados["falhas_recuperacao_bola"] += 1
+            mudou = True
+        return mudou
+
+    def resumo(self):
+        """Mesmo formato de identificar_eventos_por_time."""
+        resultado = {}
+        for nome_time, dados in self.times.items():
+            contagens = {}
+            for metrica in METRICAS_POR_JOGADOR:
+                jogadores = sorted(dados["jogadores"][metrica])
+                contagens[metrica] = pd.Series([dados["jogadores"][metrica][j] for j in jogadores], dtype="int64",
+                                               index=pd.Index(jogadores, name="player", dtype=object))
+            resultado[nome_time] = {
+                "gols": contagens["gols"],
+                "jogadores_gols": np.array(list(dados["jogadores_gols"]), dtype=object),
+                "assistencias": contagens["assistencias"],
+                "jogadores_assistencias": np.array(list(dados["jogadores_assistencias"]), dtype=object),
+                "passes": contagens["passes"],
+                "finalizacoes": contagens["finalizacoes"],
+                "cartoes_amarelos": dados["cartoes_amarelos"],
+                "cartoes_vermelhos": dados["cartoes_vermelhos"],
+                "desarmes_totais": dados["desarmes_totais"],
+                "duelos_ganhos": dados["duelos_vencidos"] if "duel_outcome" in self.colunas_resultado else dados["desarmes_totais"],
+                "interceptacoes_bem_sucedidas": (dados["interceptacoes_vencidas"] if "interception_outcome" in self.colunas_resultado
+                                                 else dados["interceptacoes"]),
+                "falhas_recuperacao_bola": dados["falhas_recuperacao_bola"],
+            }
+        return resultado
+
+
+def _segundos(evento):
+    minuto, segundo = evento.get("minute", 0), evento.get("second", 0)
+    return 0.0 if _ausente(minuto) or _ausente(segundo) else float(minuto) * 60 + float(segundo)
+
+
+async def reproduzir(eventos, velocidade=1.0, dormir=asyncio.sleep):
+    """Entrega os eventos de uma partida salva um a um, esperando o tempo de jogo entre eles dividido
+    por `velocidade` (60 = um minuto de jogo por segundo; 0 = sem espera). Simula um feed ao vivo."""
+    anterior = None
+    for evento in eventos.to_dict("records"):
+        if velocidade and anterior is not None and evento.get("period") == anterior.get("period"):
+            espera = (_segundos(evento) - _segundos(anterior)) / velocidade
+            if espera > 0:
+                await dormir(espera)
+        anterior = evento
+        yield evento
+
+
+def main():
+    from comum.agregacao import identificar_eventos_por_time
+    from comum.eventos import sb_eventos_partida
+
+    parser = argparse.ArgumentParser(description="Reproduz uma partida salva como se fosse ao vivo, mostrando o placar e os cartões.")
+    parser.add_argument("match_id", type=int)
+    parser.add_argument("--velocidade", type=float, default=60.0, help="segundos de jogo por segundo real (0 = sem espera)")
+    args = parser.parse_args()
+
+    eventos = sb_eventos_partida(args.match_id)
+    agregador = AgregadorAoVivo()
+
+    async def rodar():
+        inicio = time.perf_counter()
+        async for evento in reproduzir(eventos, args.velocidade):
+            if agregador.atualizar(evento):
+                placar = "  ".join(f"{t} {int(d['gols'].sum())} ({d['cartoes_amarelos']}A {d['cartoes_vermelhos']}V)"
+                                   for t, d in agregador.resumo().items())
+                print(f"{evento.get('minute')}' {placar}", end="\r")
+        print(f"\n{agregador.eventos} eventos em {time.perf_counter() - inicio:.2f}s")
+
+    asyncio.run(rodar())
+    lote = identificar_eventos_por_time(eventos)
+    iguais = lote.keys() == agregador.resumo().keys() and all(
+        str(lote[t]) == str(agregador.resumo()[t]) for t in lote)
+    print("resumo igual ao de identificar_eventos_por_time" if iguais else "resumo DIFERENTE do de identificar_eventos_por_time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from statsbombpy import public, sb
+
+from comum import DIRETORIO_RAIZ
+from comum.arquivos import escrever_atomico, salvar_json
+from comum.metricas import contar_erro
+
+DIRETORIO_CACHE = os.environ.get("SB_CACHE_DIR", os.path.join(DIRETORIO_RAIZ, "cache", "statsbomb"))
+
+_METADADOS_COLUNAS_JSON = b"colunas_json"
+
+
+def usar_open_data_local(diretorio):
+    """Faz o statsbombpy ler os JSONs de um checkout local do open-data em vez da internet."""
+    if os.path.isdir(os.path.join(diretorio, "data")):
+        diretorio = os.path.join(diretorio, "data")
+
+    def resposta_local(caminho):
+        relativo = caminho.rsplit("/data/", 1)[1]
+        with open(os.path.join(diretorio, relativo), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+
+    public.get_response = resposta_local
+
+
+def usar_open_data_url(base_url, timeout=60):
+    """Troca o endereço do open-data (raw.githubusercontent.com) por outro servidor com a mesma estrutura
+    de pastas, por exemplo um servidor local de fixtures: `python -m http.server -d open-data/data`."""
+    base_url = base_url.rstrip("/")
+
+    def resposta_remota(caminho):
+        relativo = caminho.rsplit("/data/", 1)[1]
+        resposta = requests.get(f"{base_url}/{relativo}", timeout=timeout)
+        resposta.raise_for_status()
+        return resposta.json()
+
+    public.get_response = resposta_remota
+
+
+if os.environ.get("SB_OPEN_DATA_DIR"):
+    usar_open_data_local(os.environ["SB_OPEN_DATA_DIR"])
+elif os.environ.get("SB_OPEN_DATA_URL"):
+    usar_open_data_url(os.environ["SB_OPEN_DATA_URL"])
+
+
+def _baixar(funcao, **parametros):
+    try:
+        return funcao(**parametros)
+    except Exception as e:
+        contar_erro("statsbomb", e)
+        raise
+
+
+def _caminho_eventos(match_id):
+    return os.path.join(DIRETORIO_CACHE, "eventos", f"{int(match_id)}.parquet")
+
+
+def _caminho_escalacoes(match_id):
+    return os.path.join(DIRETORIO_CACHE, "escalacoes", f"{int(match_id)}.parquet")
+
+
+def _caminho_partidas(competition_id, season_id):
+    return os.path.join(DIRETORIO_CACHE, "partidas", f"{int(competition_id)}_{int(season_id)}.parquet")
+
+
+def _colunas_aninhadas(df):
+    colunas = []
+    for coluna in df.columns[df.dtypes == object]:
+        tipos = set(map(type, df[coluna].dropna()))
+        if tipos & {list, dict} or len(tipos) > 1:
+            colunas.append(coluna)
+    return colunas
+
+
+def _salvar_parquet(df, caminho):
+    colunas_json = _colunas_aninhadas(df)
+    df = df.copy()
+    for coluna in colunas_json:
+        df[coluna] = [json.dumps(v) if isinstance(v, (list, dict)) or not pd.isna(v) else None for v in df[coluna]]
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[_METADADOS_COLUNAS_JSON] = json.dumps(colunas_json).encode()
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    escrever_atomico(caminho, lambda temporario: pq.write_table(tabela, temporario, compression="zstd"))
+
+
+def _ler_parquet(caminho):
+    tabela = pq.read_table(caminho)
+    colunas_json = json.loads((tabela.schema.metadata or {}).get(_METADADOS_COLUNAS_JSON, b"[]"))
+    df = tabela.to_pandas()
+    for coluna in colunas_json:
+        df[coluna] = [json.loads(v) if v is not None else np.nan for v in df[coluna]]
+    return df
+
+
+def carregar_eventos(match_id):
+    caminho = _caminho_eventos(match_id)
+    if os.path.exists(caminho):
+        return _ler_parquet(caminho)
+    eventos = _baixar(sb.events, match_id=int(match_id))
+    _salvar_parquet(eventos, caminho)
+    return eventos
+
+
+def eventos_salvos(match_id):
+    return os.path.exists(_caminho_eventos(match_id))
+
+
+def carregar_escalacoes(match_id):
+    """Escalações da partida no formato do sb.lineups: {time: DataFrame dos jogadores}."""
+    caminho = _caminho_escalacoes(match_id)
+    if os.path.exists(caminho):
+        salvas = _ler_parquet(caminho)
+        return {time_: jogadores.drop(columns="team").reset_index(drop=True)
+                for time_, jogadores in salvas.groupby("team", sort=False)}
+    escalacoes = _baixar(sb.lineups, match_id=int(match_id))
+    _salvar_parquet(pd.concat([jogadores.assign(team=time_) for time_, jogadores in escalacoes.items()], ignore_index=True), caminho)
+    return escalacoes
+
+
+def escalacoes_salvas(match_id):
+    return os.path.exists(_caminho_escalacoes(match_id))
+
+
+def temporadas_salvas():
+    """Lista os pares (competition_id, season_id) que já têm a tabela de partidas salva."""
+    diretorio = os.path.join(DIRETORIO_CACHE, "partidas")
+    if not os.path.isdir(diretorio):
+        return []
+    temporadas = []
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.endswith(".parquet"):
+            competition_id, season_id = nome[:-len(".parquet")].split("_")
+            temporadas.append((int(competition_id), int(season_id)))
+    return temporadas
+
+
+def carregar_partidas(competition_id, season_id):
+    caminho = _caminho_partidas(competition_id, season_id)
+    if os.path.exists(caminho):
+        return _ler_parquet(caminho)
+    partidas = _baixar(sb.matches, competition_id=int(competition_id), season_id=int(season_id))
+    _salvar_parquet(partidas, caminho)
+    return partidas
@@ -0,0 +1,24 @@
+import json
+import os
+import tempfile
+
+
+def escrever_atomico(caminho, escrever):
+    """Chama escrever(temporario) com um arquivo temporário da mesma pasta e só então troca pelo definitivo,
+    para que um processo interrompido nunca deixe um arquivo pela metade."""
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(caminho)), suffix=".tmp")
+    os.close(descritor)
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def salvar_json(dados, caminho):
+    def escrever(temporario):
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(dados, arquivo, ensure_ascii=False)
+    escrever_atomico(caminho, escrever)
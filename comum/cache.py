@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_AUSENTE = object()
+
+
+class CacheTTL:
+    """Cache em memória com limite de itens (LRU), expiração por tempo e contadores de acerto/falha.
+
+    ao_remover(chave, valor), se dado, é chamado (fora da trava) para cada item que sai do cache:
+    expulso pelo limite, expirado, removido ou limpo.
+    """
+
+    def __init__(self, max_itens=128, ttl=None, relogio=time.monotonic, ao_remover=None):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._relogio = relogio
+        self._ao_remover = ao_remover
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._calculando = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.expulsoes = 0
+
+    def _removidos(self, itens):
+        if self._ao_remover:
+            for chave, (_, valor) in itens:
+                self._ao_remover(chave, valor)
+
+    def obter(self, chave, padrao=None, contar=True):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and (item[0] is None or item[0] > self._relogio()):
+                self._itens.move_to_end(chave)
+                self.acertos += contar
+                return item[1]
+            if item is not None:
+                del self._itens[chave]
+            self.falhas += contar
+        if item is not None:
+            self._removidos([(chave, item)])
+        return padrao
+
+    def registrar_acerto(self):
+        """Conta um acerto de uma leitura feita fora do obter (ex.: CachePartidas.partida_em_memoria)."""
+        with self._lock:
+            self.acertos += 1
+
+    def guardar(self, chave, valor):
+        expira_em = self._relogio() + self.ttl if self.ttl else None
+        expulsos = []
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                expulsos.append(self._itens.popitem(last=False))
+                self.expulsoes += 1
+        self._removidos(expulsos)
+
+    def remover(self, chave):
+        with self._lock:
+            item = self._itens.pop(chave, None)
+        if item is not None:
+            self._removidos([(chave, item)])
+
+    def limpar(self):
+        with self._lock:
+            itens = list(self._itens.items())
+            self._itens.clear()
+        self._removidos(itens)
+
+    def obter_ou_calcular(self, chave, funcao, *args, **kwargs):
+        """Devolve o valor da chave ou calcula e guarda. Threads que pedem a mesma chave ausente ao mesmo
+        tempo esperam um único cálculo (se ele falhar, a próxima da fila tenta de novo)."""
+        valor = self.obter(chave, _AUSENTE)
+        if valor is not _AUSENTE:
+            return valor
+        with self._lock:
+            trava, esperando = self._calculando.get(chave, (threading.Lock(), 0))
+            self._calculando[chave] = (trava, esperando + 1)
+        try:
+            with trava:
+                valor = self.obter(chave, _AUSENTE, contar=False)
+                if valor is _AUSENTE:
+                    valor = funcao(*args, **kwargs)
+                    self.guardar(chave, valor)
+                return valor
+        finally:
+            with self._lock:
+                trava, esperando = self._calculando[chave]
+                if esperando == 1:
+                    del self._calculando[chave]
+                else:
+                    self._calculando[chave] = (trava, esperando - 1)
+
+    def estatisticas(self):
+        total = self.acertos + self.falhas
+        return {
+            "itens": len(self._itens),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "expulsoes": self.expulsoes,
+            "taxa_acerto": self.acertos / total if total else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class CachePartidas:
+    """Tabela de partidas por (competition_id, season_id), indexada por match_id.
+
+    Guarda cada partida como dict, então um resumo sai de uma leitura de dicionário sem passar pelo
+    pandas. Também mantém o índice reverso match_id -> (competition_id, season_id) das temporadas já vistas.
+    """
+
+    def __init__(self, max_temporadas=None, ttl=None):
+        max_temporadas = max_temporadas or int(os.environ.get("PARTIDAS_CACHE_MAX", "64"))
+        ttl = ttl if ttl is not None else float(os.environ.get("PARTIDAS_CACHE_TTL", "3600"))
+        self.temporadas = CacheTTL(max_temporadas, ttl, ao_remover=self._esquecer_temporada)
+        self._temporada_da_partida = {}
+        self._lock = threading.Lock()
+
+    def partidas(self, competition_id, season_id):
+        chave = (int(competition_id), int(season_id))
+        return self.temporadas.obter_ou_calcular(chave, self._carregar, *chave)
+
+    def _carregar(self, competition_id, season_id):
+        from comum import armazenamento
+        tabela = armazenamento.carregar_partidas(competition_id, season_id)
+        indice = {int(registro["match_id"]): registro for registro in tabela.to_dict("records")}
+        with self._lock:
+            for match_id in indice:
+                self._temporada_da_partida[match_id] = (competition_id, season_id)
+        return indice
+
+    def _esquecer_temporada(self, temporada, indice):
+        # O índice reverso só guarda as partidas das temporadas em memória, então não cresce sem limite.
+        with self._lock:
+            for match_id in indice:
+                if self._temporada_da_partida.get(match_id) == temporada:
+                    del self._temporada_da_partida[match_id]
+
+    def temporada_da_partida(self, match_id):
+        """Descobre a competição/temporada de um match_id, procurando também nas tabelas já salvas em disco."""
+        from comum import armazenamento
+        match_id = int(match_id)
+        if match_id not in self._temporada_da_partida:
+            with self._lock:
+                conhecidas = set(self._temporada_da_partida.values())
+            for competition_id, season_id in armazenamento.temporadas_salvas():
+                if (competition_id, season_id) in conhecidas:
+                    continue
+                if match_id in self.partidas(competition_id, season_id):
+                    break
+        return self._temporada_da_partida.get(match_id)
+
+    def partida_em_memoria(self, match_id, competition_id=None, season_id=None):
+        """Procura a partida só no que já está carregado (nunca bloqueia); devolve None se não achar."""
+        if competition_id is None or season_id is None:
+            temporada = self._temporada_da_partida.get(int(match_id))
+            if temporada is None:
+                return None
+            competition_id, season_id = temporada
+        partidas = self.temporadas.obter((int(competition_id), int(season_id)), contar=False)
+        if partidas is None or int(match_id) not in partidas:
+            return None
+        self.temporadas.registrar_acerto()
+        return partidas[int(match_id)]
+
+    def partida(self, match_id, competition_id=None, season_id=None):
+        if competition_id is None or season_id is None:
+            temporada = self.temporada_da_partida(match_id)
+            if temporada is None:
+                return None
+            competition_id, season_id = temporada
+        return self.partidas(competition_id, season_id).get(int(match_id))
@@ -0,0 +1,22 @@
+import hashlib
+
+PARAMETROS_IGNORADOS = {"force_refresh"}
+
+
+def etag_forte(corpo):
+    return '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+
+
+def etag_confere(if_none_match, etag):
+    """Compara o cabeçalho If-None-Match com o ETag (comparação fraca, como manda o RFC 9110 para GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == alvo for candidato in if_none_match.split(","))
+
+
+def chave_url(caminho, parametros):
+    """Chave da resposta: caminho + parâmetros em ordem, sem os que só mudam como ela é calculada."""
+    return caminho, tuple(sorted((k, v) for k, v in parametros if k not in PARAMETROS_IGNORADOS))
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from comum import DIRETORIO_RAIZ
+
+CAMINHO_PADRAO = os.environ.get("NARRACOES_CACHE_PATH", os.path.join(DIRETORIO_RAIZ, "cache", "narracoes.sqlite"))
+
+
+def normalizar_prompt(prompt):
+    return " ".join(prompt.split())
+
+
+class CacheNarracoes:
+    """Cache persistente (SQLite) das narrações do LLM, endereçado pelo hash de modelo + prompt + estilo.
+
+    Quando o total passa de max_bytes, as narrações acessadas há mais tempo são apagadas primeiro.
+    Com ttl (segundos), narrações mais antigas que isso são ignoradas e geradas de novo.
+    """
+
+    def __init__(self, caminho=None, max_bytes=None, ttl=None, relogio=time.time):
+        self.caminho = caminho or CAMINHO_PADRAO
+        self.max_bytes = max_bytes or int(os.environ.get("NARRACOES_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+        if ttl is None and os.environ.get("NARRACOES_CACHE_TTL"):
+            ttl = float(os.environ["NARRACOES_CACHE_TTL"])
+        self.ttl = ttl
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS narracoes ("
+            " chave TEXT PRIMARY KEY, modelo TEXT, estilo TEXT, texto TEXT,"
+            " tamanho INTEGER, criado_em REAL, acessado_em REAL)"
+        )
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS narracoes_acesso ON narracoes (acessado_em)")
+        self._conexao.commit()
+
+    @staticmethod
+    def chave(modelo, prompt, estilo):
+        conteudo = "\0".join([modelo, normalizar_prompt(prompt), str(estilo)])
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def obter(self, modelo, prompt, estilo):
+        chave = self.chave(modelo, prompt, estilo)
+        agora = self._relogio()
+        with self._lock:
+            linha = self._conexao.execute("SELECT texto, criado_em FROM narracoes WHERE chave = ?", (chave,)).fetchone()
+            if linha is None or (self.ttl is not None and agora - linha[1] > self.ttl):
+                self.falhas += 1
+                return None
+            self._conexao.execute("UPDATE narracoes SET acessado_em = ? WHERE chave = ?", (agora, chave))
+            self._conexao.commit()
+            self.acertos += 1
+            return linha[0]
+
+    def guardar(self, modelo, prompt, estilo, texto):
+        chave = self.chave(modelo, prompt, estilo)
+        agora = self._relogio()
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO narracoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, modelo, str(estilo), texto, len(texto.encode("utf-8")), agora, agora),
+            )
+            self._expulsar()
+            self._conexao.commit()
+
+    def _expulsar(self):
+        total = self._conexao.execute("SELECT COALESCE(SUM(tamanho), 0) FROM narracoes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for chave, tamanho in self._conexao.execute("SELECT chave, tamanho FROM narracoes ORDER BY acessado_em").fetchall():
+            self._conexao.execute("DELETE FROM narracoes WHERE chave = ?", (chave,))
+            total -= tamanho
+            if total <= self.max_bytes:
+                break
+
+    def obter_ou_gerar(self, modelo, prompt, estilo, gerar, forcar=False):
+        """Devolve a narração do cache ou chama gerar() e guarda o resultado; forcar=True sempre gera de novo."""
+        texto = None if forcar else self.obter(modelo, prompt, estilo)
+        if texto is None:
+            texto = gerar()
+            self.guardar(modelo, prompt, estilo, texto)
+        return texto
+
+    def estatisticas(self):
+        with self._lock:
+            itens, tamanho = self._conexao.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM narracoes").fetchone()
+        return {"itens": itens, "bytes": tamanho, "acertos": self.acertos, "falhas": self.falhas}
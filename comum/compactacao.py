@@ -0,0 +1,111 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Colunas usadas pela agregação, perfis, contexto do LLM, exportação e mapas. O resto do sb.events
+# (id/related_events em UUID, tactics, freeze frames, timestamp em texto...) é descartado.
+COLUNAS_EVENTOS = [
+    "match_id", "index", "period", "minute", "second", "duration", "possession",
+    "type", "play_pattern", "team", "team_id", "possession_team", "possession_team_id",
+    "player", "player_id", "position", "under_pressure", "counterpress",
+    "localizacao_x", "localizacao_y",
+    "pass_recipient", "pass_recipient_id", "pass_length", "pass_angle", "pass_height", "pass_type",
+    "pass_body_part", "pass_outcome", "pass_goal_assist", "pass_shot_assist", "pass_cross",
+    "passe_destino_x", "passe_destino_y",
+    "conducao_destino_x", "conducao_destino_y",
+    "shot_outcome", "shot_type", "shot_body_part", "shot_statsbomb_xg",
+    "finalizacao_destino_x", "finalizacao_destino_y", "finalizacao_destino_z",
+    "dribble_outcome", "duel_type", "duel_outcome", "interception_outcome",
+    "ball_recovery_recovery_failure", "foul_committed_card", "bad_behaviour_card",
+    "substitution_replacement", "substitution_outcome",
+]
+
+COLUNAS_ID = {"match_id", "team_id", "possession_team_id", "player_id", "pass_recipient_id"}
+
+
+def _ids(serie):
+    numeros = pd.to_numeric(serie, errors="coerce")
+    if numeros.isna().any():
+        return numeros.astype("Int32")
+    return numeros.astype("int32")
+
+
+def _objeto(serie):
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo == "empty":
+        return None
+    if tipo == "boolean":
+        # Colunas "True ou ausente" do StatsBomb (pass_goal_assist, under_pressure...) viram bool.
+        return serie.notna() & serie.eq(True)
+    if tipo == "string":
+        return serie.astype("category")
+    return serie
+
+
+def compactar_coluna(coluna, serie):
+    if coluna in COLUNAS_ID:
+        return _ids(serie)
+    if serie.dtype == object:
+        return _objeto(serie)
+    if pd.api.types.is_bool_dtype(serie):
+        return serie
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast="integer")
+    if pd.api.types.is_float_dtype(serie):
+        return serie.astype("float32")
+    return serie
+
+
+def compactar(eventos, colunas=None):
+    """Mantém só as colunas declaradas e troca os tipos: textos repetidos viram category, ids viram
+    inteiros, números são reduzidos (int8/int16, float32) e as colunas True/ausente viram bool.
+    Colunas totalmente vazias são descartadas."""
+    compacto = {}
+    for coluna in COLUNAS_EVENTOS if colunas is None else colunas:
+        if coluna not in eventos.columns:
+            continue
+        serie = compactar_coluna(coluna, eventos[coluna])
+        if serie is not None:
+            compacto[coluna] = serie
+    return pd.DataFrame(compacto, index=eventos.index)
+
+
+def bytes_em_memoria(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def relatorio(antes, depois):
+    bytes_antes = bytes_em_memoria(antes)
+    bytes_depois = bytes_em_memoria(depois)
+    return {
+        "colunas_antes": antes.shape[1],
+        "colunas_depois": depois.shape[1],
+        "bytes_antes": bytes_antes,
+        "bytes_depois": bytes_depois,
+        "reducao": bytes_antes / bytes_depois if bytes_depois else float("inf"),
+    }
+
+
+def main():
+    from comum import armazenamento
+    from comum.eventos import extrair_coordenadas
+
+    parser = argparse.ArgumentParser(description="Mostra a memória dos eventos de cada partida antes e depois da compactação.")
+    parser.add_argument("match_ids", type=int, nargs="+")
+    args = parser.parse_args()
+
+    print(f"{'partida':>10} {'colunas':>9} {'antes (KB)':>11} {'depois (KB)':>12} {'redução':>8}")
+    totais = np.zeros(2)
+    for match_id in args.match_ids:
+        brutos = armazenamento.carregar_eventos(match_id)
+        r = relatorio(brutos, compactar(extrair_coordenadas(brutos.copy())))
+        totais += [r["bytes_antes"], r["bytes_depois"]]
+        print(f"{match_id:>10} {r['colunas_antes']:>4}->{r['colunas_depois']:<4} {r['bytes_antes'] / 1024:>11.0f} "
+              f"{r['bytes_depois'] / 1024:>12.0f} {r['reducao']:>7.1f}x")
+    if len(args.match_ids) > 1:
+        print(f"{'total':>10} {'':>9} {totais[0] / 1024:>11.0f} {totais[1] / 1024:>12.0f} {totais[0] / totais[1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
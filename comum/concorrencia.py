@@ -0,0 +1,49 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = int(os.environ.get("API_MAX_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="bloqueante")
+
+
+async def em_thread(funcao, *args, **kwargs):
+    """Roda uma função bloqueante no pool limitado, sem travar o event loop. A função vê os mesmos
+    contextvars de quem chamou (ex.: os tempos da requisição em comum/metricas.py)."""
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(contexto.run, funcao, *args, **kwargs))
+
+
+_FIM = object()
+
+
+async def iterar_em_thread(iteravel):
+    """Percorre um iterador bloqueante (ex.: o stream do Gemini) no pool, entregando cada item ao event loop."""
+    iterador = iter(iteravel)
+    while True:
+        item = await em_thread(next, iterador, _FIM)
+        if item is _FIM:
+            return
+        yield item
+
+
+class ChamadaUnica:
+    """Faz chamadas concorrentes com a mesma chave compartilharem uma única execução em andamento."""
+
+    def __init__(self):
+        self._em_andamento = {}
+
+    def em_andamento(self):
+        return len(self._em_andamento)
+
+    async def executar(self, chave, funcao, *args, **kwargs):
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(em_thread(funcao, *args, **kwargs))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        # shield: se um cliente desistir, a execução continua para os outros que esperam a mesma chave.
+        return await asyncio.shield(tarefa)
@@ -0,0 +1,102 @@
+import math
+import os
+
+import pandas as pd
+
+from comum.agregacao import identificar_eventos_por_time
+
+ORCAMENTO_PADRAO = int(os.environ.get("LLM_CONTEXTO_TOKENS", "4000"))
+
+
+def estimar_tokens(texto):
+    """Estimativa simples (~4 caracteres por token), suficiente para respeitar o limite do prompt."""
+    return math.ceil(len(texto) / 4)
+
+
+def _coluna(eventos, coluna):
+    if coluna not in eventos.columns:
+        return pd.Series(None, index=eventos.index, dtype=object)
+    # object: as colunas categóricas de tipos diferentes precisam ser combinadas (fillna) entre si.
+    return eventos[coluna].astype(object)
+
+
+def secao_times(eventos):
+    linhas = []
+    for time_, dados in identificar_eventos_por_time(eventos).items():
+        artilheiros = ", ".join(f"{jogador} ({int(gols)})" for jogador, gols in dados["gols"].items())
+        linhas.append(
+            f"{time_}: {int(dados['gols'].sum())} gols{f' [{artilheiros}]' if artilheiros else ''}, "
+            f"{int(dados['assistencias'].sum())} assistências, {int(dados['passes'].sum())} passes, "
+            f"{int(dados['finalizacoes'].sum())} finalizações, {dados['cartoes_amarelos']} amarelos, "
+            f"{dados['cartoes_vermelhos']} vermelhos, {dados['desarmes_totais']} desarmes, "
+            f"{dados['duelos_ganhos']} duelos ganhos, {dados['interceptacoes_bem_sucedidas']} interceptações, "
+            f"{dados['falhas_recuperacao_bola']} falhas de recuperação"
+        )
+    return "\n".join(linhas)
+
+
+def secao_partida(partida):
+    if partida is None:
+        return ""
+    return (
+        f"Partida {partida['match_id']}: {partida['home_team']} {partida['home_score']} x "
+        f"{partida['away_score']} {partida['away_team']}, {partida.get('competition', '')} "
+        f"{partida.get('season', '')} ({partida.get('competition_stage', '')}), estádio {partida.get('stadium', '')}, "
+        f"{partida.get('match_date', '')} {partida.get('kick_off', '')}, árbitro {partida.get('referee', '')}"
+    )
+
+
+def secao_eventos_chave(eventos, limite=40):
+    """Gols, cartões e substituições em ordem cronológica."""
+    tipo = _coluna(eventos, "type")
+    gols = (tipo == "Shot") & (_coluna(eventos, "shot_outcome") == "Goal")
+    cartao = _coluna(eventos, "foul_committed_card").fillna(_coluna(eventos, "bad_behaviour_card"))
+    chave = gols | cartao.notna() | (tipo == "Substitution")
+
+    selecionados = eventos[chave]
+    ordem = [c for c in ["period", "minute", "second"] if c in selecionados.columns]
+    if ordem:
+        selecionados = selecionados.sort_values(ordem, kind="stable")
+
+    linhas = []
+    for indice, evento in selecionados.head(limite).iterrows():
+        if gols[indice]:
+            descricao = "Gol"
+        elif tipo[indice] == "Substitution":
+            descricao = f"Substituição (entra {evento.get('substitution_replacement')})"
+        else:
+            descricao = str(cartao[indice])
+        linhas.append(f"{evento.get('minute')}' {evento.get('team')} - {evento.get('player')}: {descricao}")
+    return "\n".join(linhas)
+
+
+def secao_escalacoes(escalacoes):
+    if not escalacoes:
+        return ""
+    linhas = []
+    for time_, jogadores in escalacoes.items():
+        nomes = ", ".join(f"#{j['jersey_number']} {j['player_name']}" for _, j in jogadores.iterrows())
+        linhas.append(f"{time_}: {nomes}")
+    return "\n".join(linhas)
+
+
+def montar_contexto(secoes, orcamento_tokens=None):
+    """Junta as seções (título, texto) na ordem de prioridade dada, dentro do orçamento de tokens.
+
+    Uma seção que não cabe inteira é descartada e as seguintes ainda são tentadas, então o resultado
+    só depende das seções e do orçamento. Seções com título None entram sem cabeçalho (ex.: os trechos
+    do comum/recuperacao.py, do mais relevante ao menos). Devolve (contexto, títulos descartados).
+    """
+    orcamento_tokens = orcamento_tokens or ORCAMENTO_PADRAO
+    partes, descartadas, usados = [], [], 0
+    for titulo, texto in secoes:
+        if not texto:
+            continue
+        bloco = f"## {titulo}\n{texto}" if titulo else texto
+        tokens = estimar_tokens(bloco) + 1
+        if usados + tokens > orcamento_tokens:
+            descartadas.append(titulo)
+            continue
+        partes.append(bloco)
+        usados += tokens
+    return "\n\n".join(partes), descartadas
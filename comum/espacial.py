@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Campo do StatsBomb: 120 x 80, com cada time sempre atacando no sentido de x crescente.
+COMPRIMENTO, LARGURA = 120.0, 80.0
+TERCOS = ["defensivo", "meio", "ofensivo"]
+CORREDORES = ["esquerdo", "central", "direito"]
+
+
+def _codigos(serie):
+    """Códigos inteiros (-1 para ausente) e os nomes de cada código, sem passar por Python evento a evento."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    codigos, nomes = pd.factorize(serie)
+    return codigos, pd.Index(nomes)
+
+
+def _indice_caixa(valores, limite, caixas):
+    return np.clip((valores * (caixas / limite)).astype(np.int64), 0, caixas - 1)
+
+
+def mapa_calor(eventos, por="team", caixas=(12, 8), tipos=None, x="localizacao_x", y="localizacao_y"):
+    """Contagem de ações por caixa do campo (caixas[0] ao longo do comprimento, caixas[1] da largura).
+
+    Com `por` (ex.: "team" ou "player") devolve {grupo: matriz}; sem ele, uma matriz só. É um único
+    np.bincount sobre o índice (grupo, caixa_x, caixa_y), o mesmo resultado de um np.histogram2d por grupo.
+    """
+    nx, ny = caixas
+    if eventos.empty or x not in eventos.columns or y not in eventos.columns:
+        return {} if por else np.zeros(caixas, dtype=np.int64)
+
+    mascara = eventos[x].notna().to_numpy() & eventos[y].notna().to_numpy()
+    if tipos:
+        mascara &= eventos["type"].isin(tipos).to_numpy(dtype=bool)
+    if por:
+        codigos, nomes = _codigos(eventos[por])
+        mascara &= codigos >= 0
+    else:
+        codigos, nomes = np.zeros(len(eventos), dtype=np.int64), pd.Index([None])
+
+    ix = _indice_caixa(eventos[x].to_numpy(dtype=np.float64)[mascara], COMPRIMENTO, nx)
+    iy = _indice_caixa(eventos[y].to_numpy(dtype=np.float64)[mascara], LARGURA, ny)
+    plano = (codigos[mascara].astype(np.int64) * nx + ix) * ny + iy
+    contagens = np.bincount(plano, minlength=len(nomes) * nx * ny).reshape(len(nomes), nx, ny)
+    if not por:
+        return contagens[0]
+    usados = contagens.reshape(len(nomes), -1).any(axis=1)
+    return {nome: contagens[i] for i, nome in enumerate(nomes) if usados[i]}
+
+
+def zonas_por_grupo(eventos, por="team", tipos=None):
+    """{grupo: (ações por terço {terço: n}, grade 3x3 terço x corredor)}, a partir do mapa de calor 3x3."""
+    return {grupo: (dict(zip(TERCOS, grade.sum(axis=1).tolist())), grade)
+            for grupo, grade in mapa_calor(eventos, por, (3, 3), tipos).items()}
+
+
+def contagem_zonas(eventos, por="team", tipos=None):
+    """Ações por terço do campo (defensivo/meio/ofensivo) e por zona 3x3 (terço x corredor), uma linha por grupo."""
+    linhas = []
+    for grupo, (tercos, grade) in zonas_por_grupo(eventos, por, tipos).items():
+        linha = {por: grupo, **tercos}
+        for i, terco in enumerate(TERCOS):
+            for j, corredor in enumerate(CORREDORES):
+                linha[f"{terco}_{corredor}"] = int(grade[i, j])
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def rede_passes(eventos, time_, minimo_passes=1, apenas_completos=True):
+    """Rede de passes de um time: posição média de cada jogador (onde passa e onde recebe) e as
+    arestas passador -> recebedor com a quantidade de passes. Devolve (nos, arestas) em DataFrames."""
+    colunas = {"type", "team", "player", "pass_recipient", "localizacao_x", "localizacao_y",
+               "passe_destino_x", "passe_destino_y"}
+    if eventos.empty or not colunas <= set(eventos.columns):
+        return (pd.DataFrame(columns=["player", "x", "y", "passes"]),
+                pd.DataFrame(columns=["origem", "destino", "passes"]))
+
+    passes = eventos[(eventos["type"] == "Pass") & (eventos["team"] == time_) & eventos["pass_recipient"].notna()]
+    if apenas_completos and "pass_outcome" in passes.columns:
+        passes = passes[passes["pass_outcome"].isna()]
+
+    toques = pd.concat([
+        pd.DataFrame({"player": passes["player"].astype(object), "x": passes["localizacao_x"], "y": passes["localizacao_y"]}),
+        pd.DataFrame({"player": passes["pass_recipient"].astype(object), "x": passes["passe_destino_x"], "y": passes["passe_destino_y"]}),
+    ], ignore_index=True)
+    nos = toques.groupby("player").agg(x=("x", "mean"), y=("y", "mean"))
+    nos["passes"] = passes["player"].astype(object).value_counts().reindex(nos.index, fill_value=0)
+
+    arestas = (passes.groupby([passes["player"].astype(object), passes["pass_recipient"].astype(object)])
+               .size().rename("passes").reset_index())
+    arestas.columns = ["origem", "destino", "passes"]
+    arestas = arestas[arestas["passes"] >= minimo_passes].sort_values("passes", ascending=False, kind="stable")
+    return nos.reset_index(), arestas.reset_index(drop=True)
@@ -0,0 +1,51 @@
+import numpy as np
+import pyarrow as pa
+
+from comum import armazenamento
+from comum.compactacao import compactar
+from comum.metricas import medir
+
+COLUNAS_COORDENADAS = {
+    "location": ["localizacao_x", "localizacao_y"],
+    "pass_end_location": ["passe_destino_x", "passe_destino_y"],
+    "shot_end_location": ["finalizacao_destino_x", "finalizacao_destino_y", "finalizacao_destino_z"],
+    "carry_end_location": ["conducao_destino_x", "conducao_destino_y"],
+}
+
+
+def coordenadas(coluna, dimensoes=2):
+    """Transforma uma coluna de listas [x, y(, z)] em um array float32 (dimensoes, n), com NaN onde falta valor."""
+    saida = np.full((dimensoes, len(coluna)), np.nan, dtype=np.float32)
+    listas = pa.array(np.asarray(coluna, dtype=object), type=pa.list_(pa.float64()), from_pandas=True)
+    if isinstance(listas, pa.ChunkedArray):
+        listas = pa.concat_arrays(listas.chunks)
+
+    inicios = listas.offsets.to_numpy()
+    tamanhos = np.diff(inicios)
+    tamanhos[listas.is_null().to_numpy(zero_copy_only=False)] = 0
+    valores = listas.values.to_numpy(zero_copy_only=False)
+    for eixo in range(dimensoes):
+        tem_eixo = tamanhos > eixo
+        saida[eixo, tem_eixo] = valores[inicios[:-1][tem_eixo] + eixo]
+    return saida
+
+
+def extrair_coordenadas(eventos):
+    """Adiciona (no próprio DataFrame) as colunas x/y de localização, destino do passe e destino
+    da finalização, mantendo todos os eventos (os que não têm coordenada ficam com NaN)."""
+    for coluna, destinos in COLUNAS_COORDENADAS.items():
+        if coluna not in eventos.columns:
+            continue
+        for destino, valores in zip(destinos, coordenadas(eventos[coluna], len(destinos))):
+            eventos[destino] = valores
+    return eventos
+
+
+def sb_eventos_partida(partida_id):
+    """Eventos da partida já com as coordenadas extraídas e compactados (ver comum/compactacao.py)."""
+    with medir("statsbomb"):
+        eventos = armazenamento.carregar_eventos(partida_id)
+    with medir("coordenadas"):
+        eventos = extrair_coordenadas(eventos)
+    with medir("compactacao"):
+        return compactar(eventos)
@@ -0,0 +1,114 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from comum.compactacao import COLUNAS_EVENTOS, COLUNAS_ID
+
+FORMATOS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_INTEIROS = {"index", "period", "minute", "second", "possession"}
+_REAIS = {"duration", "pass_length", "pass_angle", "shot_statsbomb_xg"}
+_BOOLEANOS = {"under_pressure", "counterpress", "pass_goal_assist", "pass_shot_assist", "pass_cross",
+              "ball_recovery_recovery_failure"}
+
+
+def tipo_arrow(coluna):
+    """Tipo fixo de cada coluna na exportação, para todas as partidas saírem com o mesmo schema
+    (a compactação escolhe int8/int16 e descarta colunas vazias partida a partida)."""
+    if coluna in COLUNAS_ID or coluna in _INTEIROS:
+        return pa.int32()
+    if coluna in _REAIS or coluna.endswith(("_x", "_y", "_z")):
+        return pa.float32()
+    if coluna in _BOOLEANOS:
+        return pa.bool_()
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def esquema(colunas=None):
+    return pa.schema([(coluna, tipo_arrow(coluna)) for coluna in colunas or COLUNAS_EVENTOS])
+
+
+def colunas_invalidas(colunas):
+    return [coluna for coluna in colunas if coluna not in COLUNAS_EVENTOS]
+
+
+def _valores_em(eventos, coluna, valores):
+    if coluna not in eventos.columns:
+        return np.zeros(len(eventos), dtype=bool)
+    return eventos[coluna].isin(valores).to_numpy(dtype=bool)
+
+
+def filtrar(eventos, times=None, tipos=None, periodos=None):
+    mascara = np.ones(len(eventos), dtype=bool)
+    if times:
+        mascara &= _valores_em(eventos, "team", times)
+    if tipos:
+        mascara &= _valores_em(eventos, "type", tipos)
+    if periodos:
+        mascara &= _valores_em(eventos, "period", periodos)
+    return eventos[mascara]
+
+
+def _conformar(array, tipo):
+    if pa.types.is_dictionary(tipo) and not pa.types.is_dictionary(array.type):
+        array = array.cast(pa.string()).dictionary_encode()
+    return array.cast(tipo)
+
+
+def tabela(eventos, schema):
+    """Converte os eventos (já filtrados) para uma tabela Arrow com o schema pedido; colunas que não
+    existem na partida saem como nulas."""
+    colunas = []
+    for campo in schema:
+        if campo.name in eventos.columns:
+            colunas.append(_conformar(pa.array(eventos[campo.name], from_pandas=True), campo.type))
+        else:
+            colunas.append(pa.nulls(len(eventos), campo.type))
+    return pa.Table.from_arrays(colunas, schema=schema)
+
+
+class _Buffer:
+    """Destino de escrita que acumula os bytes até serem enviados na resposta."""
+
+    def __init__(self):
+        self.partes = []
+        self.closed = False
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def esvaziar(self):
+        dados = b"".join(self.partes)
+        self.partes = []
+        return dados
+
+
+class Exportador:
+    """Escreve uma tabela por partida em Arrow IPC (stream) ou Parquet (um row group por partida),
+    devolvendo os bytes prontos a cada passo para a resposta sair em partes."""
+
+    def __init__(self, formato, schema):
+        self.buffer = _Buffer()
+        if formato == "parquet":
+            self.escritor = pq.ParquetWriter(self.buffer, schema, compression="zstd")
+        else:
+            opcoes = pa.ipc.IpcWriteOptions(compression="zstd")
+            self.escritor = pa.ipc.new_stream(self.buffer, schema, options=opcoes)
+
+    def escrever(self, tabela):
+        self.escritor.write_table(tabela)
+        return self.buffer.esvaziar()
+
+    def fechar(self):
+        self.escritor.close()
+        return self.buffer.esvaziar()
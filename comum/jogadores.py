@@ -0,0 +1,54 @@
+import pandas as pd
+
+from comum.agregacao import indicadores_eventos
+
+
+def _desarmes(eventos):
+    # No StatsBomb um desarme é um Duel com duel_type "Tackle" (não existe evento do tipo "Tackle").
+    if "duel_type" not in eventos.columns:
+        return pd.Series(False, index=eventos.index)
+    return (eventos["type"] == "Duel") & (eventos["duel_type"] == "Tackle")
+
+
+def estatisticas_jogadores(eventos):
+    """Monta, em um único agrupamento, a tabela de estatísticas de todos os jogadores da partida,
+    indexada por player_id: {player_id: {"player_name", "passes", "shots", "goals", ...}}.
+    Passes, finalizações, gols e cartões vêm dos mesmos indicadores do identificar_eventos_por_time,
+    então a soma dos jogadores bate com os totais do time."""
+    marcados = indicadores_eventos(eventos)
+    indicadores = pd.DataFrame({
+        "player_id": eventos["player_id"],
+        "player_name": eventos["player"],
+        "minute": eventos["minute"],
+        "passes": marcados["passes"],
+        "shots": marcados["finalizacoes"],
+        "goals": marcados["gols"],
+        "tackles": _desarmes(eventos),
+        "yellow_cards": marcados["cartoes_amarelos"],
+        "red_cards": marcados["cartoes_vermelhos"],
+    })
+    indicadores = indicadores[indicadores["player_id"].notna()]
+
+    tabela = indicadores.groupby(indicadores["player_id"].astype("int64"), sort=False, observed=True).agg(
+        player_name=("player_name", "first"),
+        passes=("passes", "sum"),
+        shots=("shots", "sum"),
+        goals=("goals", "sum"),
+        tackles=("tackles", "sum"),
+        yellow_cards=("yellow_cards", "sum"),
+        red_cards=("red_cards", "sum"),
+        primeiro_minuto=("minute", "min"),
+        ultimo_minuto=("minute", "max"),
+    )
+    tabela["minutes_played"] = tabela["ultimo_minuto"] - tabela["primeiro_minuto"]
+    tabela = tabela.drop(columns=["primeiro_minuto", "ultimo_minuto"])
+
+    estatisticas = tabela.to_dict("index")
+    for player_id, linha in estatisticas.items():
+        linha["player_id"] = player_id
+    return estatisticas
+
+
+def estatisticas_por_nome(estatisticas):
+    """Reindexa a tabela pelo nome do jogador (o streamlit seleciona jogadores pelo nome)."""
+    return {linha["player_name"]: linha for linha in estatisticas.values()}
@@ -0,0 +1,31 @@
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.llms.base import LLM
+
+from comum.llm import cliente_llm
+
+
+class LLMCompartilhado(LLM):
+    """Adapta o cliente compartilhado de comum/llm.py (limites, retry e timeout) para o langchain."""
+    modelo: str = "gemini-1.5-flash"
+
+    @property
+    def _llm_type(self):
+        return "cliente_llm"
+
+    def _call(self, prompt, stop=None, run_manager=None, **kwargs):
+        texto = cliente_llm(self.modelo).gerar(prompt)
+        for parada in stop or []:
+            texto = texto.split(parada)[0]
+        return texto
+
+
+class ContadorChamadasLLM(BaseCallbackHandler):
+    def __init__(self):
+        self.chamadas = 0
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.chamadas += 1
+
+
+# Criado uma vez por processo: o streamlit reexecuta o script da página, mas não reimporta este módulo.
+llm = LLMCompartilhado()
@@ -0,0 +1,183 @@
+import os
+import random
+import threading
+import time
+
+from comum.metricas import contar_erro, medir
+
+MODELO_PADRAO = "gemini-1.5-flash"
+
+# Erros que valem uma nova tentativa, reconhecidos pelo nome da classe (google.api_core, requests, httpx, builtins).
+ERROS_TEMPORARIOS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError", "DeadlineExceeded",
+    "GatewayTimeout", "Timeout", "TimeoutError", "TimeoutException", "ReadTimeout", "ConnectionError",
+}
+
+TEXTO_FALSO = ("Começa a partida! Os dois times se estudam nos primeiros minutos, mas logo a bola começa a rolar "
+               "com mais velocidade. Um lance perigoso, uma defesa importante e a torcida vai à loucura. Fim de jogo!")
+
+
+class LLMIndisponivel(Exception):
+    """As tentativas acabaram e o LLM continuou respondendo com erro temporário (quota, timeout...)."""
+
+
+def erro_temporario(erro):
+    return any(classe.__name__ in ERROS_TEMPORARIOS for classe in type(erro).__mro__)
+
+
+class BaldeTokens:
+    """Limitador de taxa: `taxa` requisições por segundo, com rajadas de até `capacidade`."""
+
+    def __init__(self, taxa, capacidade=1, relogio=time.monotonic, dormir=time.sleep):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = capacidade
+        self._relogio = relogio
+        self._dormir = dormir
+        self._ultimo = relogio()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        while True:
+            with self._lock:
+                agora = self._relogio()
+                self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            self._dormir(espera)
+
+
+class BackendGemini:
+    """Chama o Gemini; genai.configure roda uma vez e cada GenerativeModel é criado uma vez."""
+
+    def __init__(self, api_key=None):
+        self._api_key = api_key
+        self._modelos = {}
+        self._lock = threading.Lock()
+
+    def _modelo(self, modelo):
+        with self._lock:
+            if modelo not in self._modelos:
+                import google.generativeai as genai
+
+                if not self._modelos:
+                    genai.configure(api_key=self._api_key or os.environ["GEMINI_KEY"])
+                self._modelos[modelo] = genai.GenerativeModel(modelo)
+            return self._modelos[modelo]
+
+    def gerar(self, modelo, prompt, timeout):
+        return self._modelo(modelo).generate_content(prompt, request_options={"timeout": timeout}).text
+
+    def gerar_em_partes(self, modelo, prompt, timeout):
+        resposta = self._modelo(modelo).generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        for parte in resposta:
+            if parte.text:
+                yield parte.text
+
+
+class BackendFalso:
+    """Backend local para testes: devolve um texto fixo palavra por palavra e levanta, em ordem,
+    as exceções de `falhas` nas primeiras chamadas."""
+
+    def __init__(self, texto=TEXTO_FALSO, falhas=(), atraso=0.0):
+        self.texto = texto
+        self.falhas = list(falhas)
+        self.atraso = atraso
+        self.chamadas = 0
+        self._lock = threading.Lock()
+
+    def _chamar(self):
+        with self._lock:
+            self.chamadas += 1
+            falha = self.falhas.pop(0) if self.falhas else None
+        if falha is not None:
+            raise falha
+
+    def gerar(self, modelo, prompt, timeout):
+        return "".join(self.gerar_em_partes(modelo, prompt, timeout))
+
+    def gerar_em_partes(self, modelo, prompt, timeout):
+        self._chamar()
+        for palavra in self.texto.split(" "):
+            time.sleep(self.atraso)
+            yield palavra + " "
+
+
+class ClienteLLM:
+    """Cliente compartilhado do LLM: limita chamadas simultâneas e requisições por segundo, aplica timeout
+    e repete erros temporários com espera exponencial e jitter."""
+
+    def __init__(self, modelo=MODELO_PADRAO, backend=None, max_concorrentes=None, requisicoes_por_minuto=None,
+                 tentativas=None, timeout=None, espera_base=0.5, espera_max=20.0, dormir=time.sleep):
+        self.modelo = modelo
+        self.backend = backend or BackendGemini()
+        max_concorrentes = max_concorrentes or int(os.environ.get("LLM_MAX_CONCORRENTES", "4"))
+        requisicoes_por_minuto = requisicoes_por_minuto or float(os.environ.get("LLM_REQUISICOES_POR_MINUTO", "60"))
+        self.tentativas = tentativas or int(os.environ.get("LLM_TENTATIVAS", "4"))
+        self.timeout = timeout or float(os.environ.get("LLM_TIMEOUT", "60"))
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self._dormir = dormir
+        self._simultaneas = threading.BoundedSemaphore(max_concorrentes)
+        self.balde = BaldeTokens(requisicoes_por_minuto / 60, max_concorrentes, dormir=dormir)
+        self.repeticoes = 0
+
+    def _esperar(self, tentativa):
+        self.repeticoes += 1
+        self._dormir(random.uniform(0, min(self.espera_max, self.espera_base * 2 ** tentativa)))
+
+    def gerar(self, prompt):
+        with medir("llm"):
+            return self._gerar(prompt)
+
+    def _gerar(self, prompt):
+        for tentativa in range(self.tentativas):
+            self.balde.adquirir()
+            try:
+                with self._simultaneas:
+                    return self.backend.gerar(self.modelo, prompt, self.timeout)
+            except Exception as e:
+                contar_erro("llm", e)
+                if not erro_temporario(e):
+                    raise
+                if tentativa == self.tentativas - 1:
+                    raise LLMIndisponivel(f"LLM indisponível após {self.tentativas} tentativas: {e}") from e
+                self._esperar(tentativa)
+
+    def gerar_em_partes(self, prompt):
+        """Como gerar, mas devolve o texto em partes. Só repete se o erro vier antes da primeira parte."""
+        for tentativa in range(self.tentativas):
+            self.balde.adquirir()
+            recebeu = False
+            try:
+                with self._simultaneas:
+                    for parte in self.backend.gerar_em_partes(self.modelo, prompt, self.timeout):
+                        recebeu = True
+                        yield parte
+                return
+            except Exception as e:
+                contar_erro("llm", e)
+                if recebeu or not erro_temporario(e):
+                    raise
+                if tentativa == self.tentativas - 1:
+                    raise LLMIndisponivel(f"LLM indisponível após {self.tentativas} tentativas: {e}") from e
+                self._esperar(tentativa)
+
+
+_clientes = {}
+_lock_clientes = threading.Lock()
+
+
+def cliente_llm(modelo=MODELO_PADRAO):
+    """Cliente único por modelo, compartilhado por API, scripts e streamlit.
+    Com LLM_FALSO=1 usa o BackendFalso (intervalo entre palavras em LLM_FALSO_ATRASO)."""
+    with _lock_clientes:
+        if modelo not in _clientes:
+            backend = None
+            if os.environ.get("LLM_FALSO"):
+                backend = BackendFalso(atraso=float(os.environ.get("LLM_FALSO_ATRASO", "0.05")))
+            _clientes[modelo] = ClienteLLM(modelo, backend)
+        return _clientes[modelo]
@@ -0,0 +1,146 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LIMITES_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Tempos da requisição atual: a API cria a lista no middleware e as etapas (mesmo em threads do pool,
+# ver concorrencia.em_thread) acrescentam nela. Fora de uma requisição fica None e só o histograma é atualizado.
+_rota = contextvars.ContextVar("rota", default="")
+_tempos = contextvars.ContextVar("tempos", default=None)
+
+
+def _rotulos(rotulos):
+    def escapar(valor):
+        return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{nome}="{escapar(valor)}"' for nome, valor in rotulos)
+
+
+class Histograma:
+    """Histograma no formato do Prometheus, com uma série por combinação de rótulos."""
+
+    def __init__(self, nome, ajuda, nomes_rotulos, limites=LIMITES_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.nomes_rotulos = tuple(nomes_rotulos)
+        self.limites = tuple(limites)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *rotulos):
+        posicao = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][posicao] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def texto(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = sorted((rotulos, [list(s[0]), s[1], s[2]]) for rotulos, s in self._series.items())
+        for rotulos, (contagens, soma, total) in series:
+            base = list(zip(self.nomes_rotulos, rotulos))
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f"{self.nome}_bucket{{{_rotulos(base + [('le', le)])}}} {acumulado}")
+            linhas.append(f"{self.nome}_sum{{{_rotulos(base)}}} {soma}")
+            linhas.append(f"{self.nome}_count{{{_rotulos(base)}}} {total}")
+        return "\n".join(linhas)
+
+
+class Contador:
+    def __init__(self, nome, ajuda, nomes_rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.nomes_rotulos = tuple(nomes_rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *rotulos, valor=1):
+        with self._lock:
+            self._valores[rotulos] = self._valores.get(rotulos, 0) + valor
+
+    def texto(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for rotulos, valor in valores:
+            linhas.append(f"{self.nome}{{{_rotulos(zip(self.nomes_rotulos, rotulos))}}} {valor}")
+        return "\n".join(linhas)
+
+
+duracao_etapas = Histograma("etapa_duracao_segundos", "Duração de cada etapa (statsbomb, coordenadas, compactacao, agregacao, llm) por rota.", ["rota", "etapa"])
+duracao_requisicoes = Histograma("requisicao_duracao_segundos", "Duração total das requisições por rota e status.", ["rota", "status"])
+erros_upstream = Contador("erros_upstream_total", "Erros das chamadas ao StatsBomb e ao LLM, por serviço e tipo de erro.", ["servico", "erro"])
+
+_caches = {}
+
+
+def registrar_cache(nome, estatisticas):
+    """`estatisticas` é uma função que devolve um dict com 'acertos' e 'falhas' (ex.: CacheTTL.estatisticas)."""
+    _caches[nome] = estatisticas
+
+
+def contar_erro(servico, erro):
+    erros_upstream.incrementar(servico, type(erro).__name__)
+
+
+def iniciar_requisicao(rota):
+    return _rota.set(rota), _tempos.set([])
+
+
+def encerrar_requisicao(tokens):
+    tempos = _tempos.get()
+    _rota.reset(tokens[0])
+    _tempos.reset(tokens[1])
+    return tempos or []
+
+
+def registrar_etapa(etapa, segundos):
+    duracao_etapas.observar(segundos, _rota.get(), etapa)
+    tempos = _tempos.get()
+    if tempos is not None:
+        tempos.append((etapa, segundos))
+
+
+@contextmanager
+def medir(etapa):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_etapa(etapa, time.perf_counter() - inicio)
+
+
+def server_timing(tempos, total=None):
+    """Cabeçalho Server-Timing: uma entrada por etapa (somando repetições) e o total da requisição."""
+    somados = {}
+    for etapa, segundos in tempos:
+        somados[etapa] = somados.get(etapa, 0.0) + segundos
+    if total is not None:
+        somados["total"] = total
+    return ", ".join(f"{etapa};dur={segundos * 1000:.2f}" for etapa, segundos in somados.items())
+
+
+def texto_prometheus():
+    blocos = [duracao_requisicoes.texto(), duracao_etapas.texto(), erros_upstream.texto()]
+    linhas = []
+    for metrica, tipo, ajuda in [("cache_acertos_total", "counter", "Acertos de cada cache."),
+                                 ("cache_falhas_total", "counter", "Falhas de cada cache."),
+                                 ("cache_taxa_acerto", "gauge", "Acertos / (acertos + falhas) de cada cache.")]:
+        linhas += [f"# HELP {metrica} {ajuda}", f"# TYPE {metrica} {tipo}"]
+        for nome, estatisticas in sorted(_caches.items()):
+            dados = estatisticas()
+            total = dados["acertos"] + dados["falhas"]
+            valor = {"cache_acertos_total": dados["acertos"], "cache_falhas_total": dados["falhas"],
+                     "cache_taxa_acerto": dados["acertos"] / total if total else 0.0}[metrica]
+            linhas.append(f"{metrica}{{{_rotulos([('cache', nome)])}}} {valor}")
+    blocos.append("\n".join(linhas))
+    return "\n".join(blocos) + "\n"
@@ -0,0 +1,77 @@
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from comum import DIRETORIO_RAIZ
+from comum.arquivos import escrever_atomico
+
+DIRETORIO_PERFIS = os.environ.get("PERFIL_DIR", os.path.join(DIRETORIO_RAIZ, "cache", "perfis"))
+
+# Uma thread parada aqui está só esperando (pool ocioso, event loop no select), não trabalhando.
+_ARQUIVOS_ESPERA = ("threading.py", "queue.py", "selectors.py")
+
+
+def token_confere(recebido, esperado):
+    return bool(recebido) and bool(esperado) and hmac.compare_digest(recebido.encode(), esperado.encode())
+
+
+def _nome_quadro(codigo):
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class AmostradorPilhas:
+    """Perfilador por amostragem: a cada `intervalo` segundos lê a pilha de todas as threads
+    (sys._current_frames) e conta as pilhas iguais. O resultado sai no formato "collapsed"
+    (quadro;quadro;... contagem), aceito pelo flamegraph.pl, speedscope e inferno."""
+
+    def __init__(self, intervalo=0.001):
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _amostrar(self):
+        proprio = threading.get_ident()
+        nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, quadro in sys._current_frames().items():
+            if ident == proprio or os.path.basename(quadro.f_code.co_filename) in _ARQUIVOS_ESPERA:
+                continue
+            pilha = []
+            while quadro is not None:
+                pilha.append(_nome_quadro(quadro.f_code))
+                quadro = quadro.f_back
+            pilha.append(nomes.get(ident, str(ident)))
+            self.pilhas[";".join(reversed(pilha))] += 1
+        self.amostras += 1
+
+    def _rodar(self):
+        while not self._parar.wait(self.intervalo):
+            self._amostrar()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._rodar, name="perfilador", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *erro):
+        self._parar.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{pilha} {contagem}\n" for pilha, contagem in self.pilhas.most_common())
+
+
+def salvar_perfil(amostrador, rota, diretorio=None):
+    """Grava o perfil em `PERFIL_DIR` e devolve o nome do arquivo."""
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}{rota.replace('/', '_')}.folded"
+    caminho = os.path.join(diretorio or DIRETORIO_PERFIS, nome)
+
+    def escrever(temporario):
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(amostrador.collapsed())
+    escrever_atomico(caminho, escrever)
+    return nome
@@ -0,0 +1,109 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from statsbombpy import sb
+
+from comum import armazenamento
+
+CONJUNTOS = {
+    "eventos": (armazenamento.carregar_eventos, armazenamento.eventos_salvos, armazenamento._caminho_eventos),
+    "escalacoes": (armazenamento.carregar_escalacoes, armazenamento.escalacoes_salvas, armazenamento._caminho_escalacoes),
+}
+
+
+def temporadas(competition_ids=None, season_ids=None):
+    """Pares (competition_id, season_id) do sb.competitions, filtrados pelos ids pedidos."""
+    competicoes = sb.competitions()
+    if competition_ids:
+        competicoes = competicoes[competicoes["competition_id"].isin(competition_ids)]
+    if season_ids:
+        competicoes = competicoes[competicoes["season_id"].isin(season_ids)]
+    return sorted({(int(c), int(s)) for c, s in zip(competicoes["competition_id"], competicoes["season_id"])})
+
+
+def tarefas_pendentes(pares, conjuntos, erros):
+    """Carrega (e salva) a tabela de partidas de cada temporada e lista o que ainda falta baixar.
+    Os arquivos já salvos são o registro do progresso: uma execução interrompida recomeça daqui."""
+    pendentes, existentes = [], 0
+    for competition_id, season_id in pares:
+        try:
+            partidas = armazenamento.carregar_partidas(competition_id, season_id)
+        except Exception as e:
+            erros[("partidas", f"{competition_id}_{season_id}")] = str(e)
+            continue
+        for match_id in sorted(int(m) for m in partidas["match_id"]):
+            for conjunto in conjuntos:
+                if CONJUNTOS[conjunto][1](match_id):
+                    existentes += 1
+                else:
+                    pendentes.append((conjunto, match_id))
+    return pendentes, existentes
+
+
+def baixar(conjunto, match_id):
+    carregar, _, caminho = CONJUNTOS[conjunto]
+    carregar(match_id)
+    return os.path.getsize(caminho(match_id))
+
+
+def prefetch(competition_ids=None, season_ids=None, conjuntos=("eventos", "escalacoes"), workers=8, progresso=None):
+    """Baixa eventos e escalações de todas as partidas das competições pedidas com `workers` downloads
+    simultâneos. Cada arquivo é gravado de forma atômica pelo armazenamento assim que termina."""
+    inicio = time.perf_counter()
+    erros = {}
+    pendentes, existentes = tarefas_pendentes(temporadas(competition_ids, season_ids), conjuntos, erros)
+
+    baixados, total_bytes = 0, 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") as pool:
+        futuros = {pool.submit(baixar, conjunto, match_id): (conjunto, match_id) for conjunto, match_id in pendentes}
+        for futuro in as_completed(futuros):
+            tarefa = futuros[futuro]
+            try:
+                total_bytes += futuro.result()
+                baixados += 1
+            except Exception as e:
+                erros[tarefa] = str(e)
+            if progresso:
+                progresso(baixados + len(erros), len(pendentes), tarefa, baixados, total_bytes, time.perf_counter() - inicio)
+
+    return {
+        "baixados": baixados,
+        "ja_salvos": existentes,
+        "erros": erros,
+        "bytes": total_bytes,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baixa para o cache local as partidas, eventos e escalações de competições inteiras.")
+    parser.add_argument("competition_ids", type=int, nargs="*", help="competições (padrão: todas do open-data)")
+    parser.add_argument("--temporadas", type=int, nargs="+", help="só estas season_id")
+    parser.add_argument("--workers", type=int, default=8, help="downloads simultâneos (padrão: 8)")
+    parser.add_argument("--sem-escalacoes", action="store_true", help="baixa só os eventos")
+    parser.add_argument("--base-url", help="servidor no lugar do open-data do GitHub (ex.: http://localhost:8765)")
+    args = parser.parse_args()
+
+    if args.base_url:
+        armazenamento.usar_open_data_url(args.base_url)
+    conjuntos = ("eventos",) if args.sem_escalacoes else ("eventos", "escalacoes")
+
+    def progresso(feitas, total, tarefa, baixados, total_bytes, decorrido):
+        print(f"[{feitas}/{total}] {tarefa[0]} {tarefa[1]} "
+              f"({baixados / decorrido:.1f} arquivos/s, {total_bytes / 1e6 / decorrido:.2f} MB/s)", file=sys.stderr)
+
+    resultado = prefetch(args.competition_ids, args.temporadas, conjuntos, args.workers, progresso)
+    segundos = resultado["segundos"]
+    print(f"{resultado['baixados']} baixados, {resultado['ja_salvos']} já estavam salvos, {len(resultado['erros'])} erros "
+          f"em {segundos:.1f}s ({resultado['baixados'] / segundos:.1f} arquivos/s, {resultado['bytes'] / 1e6 / segundos:.2f} MB/s)")
+    for (conjunto, chave), erro in resultado["erros"].items():
+        print(f"erro em {conjunto} {chave}: {erro}", file=sys.stderr)
+    if resultado["erros"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
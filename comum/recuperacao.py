@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from comum import DIRETORIO_RAIZ
+from comum.agregacao import contagens_por_jogador
+from comum.arquivos import escrever_atomico, salvar_json
+from comum.cache import CacheTTL
+from comum.contexto import secao_escalacoes, secao_eventos_chave, secao_partida, secao_times
+
+DIRETORIO_INDICES = os.environ.get("INDICES_DIR", os.path.join(DIRETORIO_RAIZ, "cache", "indices"))
+# Modelo pequeno e multilíngue (os trechos são em português), roda em CPU.
+MODELO_EMBEDDINGS = os.environ.get("EMBEDDINGS_MODELO", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+TOP_K = int(os.environ.get("RECUPERACAO_TOP_K", "8"))
+MINUTOS_JANELA = 15
+
+_embeddings = None
+_trava_embeddings = threading.Lock()
+indices_abertos = CacheTTL(int(os.environ.get("INDICES_CACHE_MAX", "32")))
+
+
+def embeddings():
+    """Modelo de embeddings local, carregado uma vez por processo (o import do torch é lento)."""
+    global _embeddings
+    with _trava_embeddings:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _embeddings = HuggingFaceEmbeddings(model_name=MODELO_EMBEDDINGS, model_kwargs={"device": "cpu"},
+                                                encode_kwargs={"normalize_embeddings": True})
+    return _embeddings
+
+
+def _normalizar(vetores):
+    vetores = np.asarray(vetores, dtype=np.float32)
+    normas = np.linalg.norm(vetores, axis=-1, keepdims=True)
+    return vetores / np.where(normas == 0, 1, normas)
+
+
+class IndiceVetorial:
+    """Vetores normalizados (float32, uma linha por trecho) e os textos; o produto interno já é o cosseno."""
+
+    def __init__(self, vetores, textos):
+        self.vetores = vetores
+        self.textos = textos
+
+    def buscar(self, consulta, k=TOP_K):
+        """Os k trechos mais parecidos com o vetor da consulta: [(similaridade, texto)], do mais parecido ao menos."""
+        if not self.textos:
+            return []
+        similaridades = self.vetores @ _normalizar(consulta)
+        k = min(k, len(self.textos))
+        melhores = np.argpartition(-similaridades, k - 1)[:k]
+        melhores = melhores[np.argsort(-similaridades[melhores], kind="stable")]
+        return [(float(similaridades[i]), self.textos[i]) for i in melhores]
+
+
+def _caminhos(nome):
+    base = os.path.join(DIRETORIO_INDICES, nome)
+    return base + ".npy", base + ".json"
+
+
+def construir_indice(nome, textos, modelo=None):
+    """Calcula os embeddings dos trechos e grava o índice (.npy com os vetores e .json com os textos)."""
+    modelo = modelo or embeddings()
+    vetores = _normalizar(modelo.embed_documents(textos)) if textos else np.zeros((0, 0), dtype=np.float32)
+    caminho_vetores, caminho_textos = _caminhos(nome)
+
+    def escrever(temporario):
+        with open(temporario, "wb") as arquivo:
+            np.save(arquivo, vetores)
+    # O .json é gravado por último: se ele existe, o .npy correspondente já está completo.
+    escrever_atomico(caminho_vetores, escrever)
+    salvar_json({"modelo": MODELO_EMBEDDINGS, "textos": textos}, caminho_textos)
+    return IndiceVetorial(vetores, textos)
+
+
+def carregar_indice(nome):
+    """Abre um índice salvo com os vetores em memória mapeada (np.load com mmap_mode="r"). None se não existir
+    ou se foi gerado com outro modelo de embeddings."""
+    caminho_vetores, caminho_textos = _caminhos(nome)
+    if not os.path.exists(caminho_textos) or not os.path.exists(caminho_vetores):
+        return None
+    with open(caminho_textos, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if dados.get("modelo") != MODELO_EMBEDDINGS:
+        return None
+    vetores = np.load(caminho_vetores, mmap_mode="r")
+    if len(vetores) != len(dados["textos"]):
+        return None
+    return IndiceVetorial(vetores, dados["textos"])
+
+
+def indice(nome, gerar_textos, modelo=None):
+    """Índice `nome`: do processo, do disco ou construído agora com os trechos de `gerar_textos()`."""
+    def abrir():
+        return carregar_indice(nome) or construir_indice(nome, gerar_textos(), modelo)
+    return indices_abertos.obter_ou_calcular(nome, abrir)
+
+
+def trechos_jogadores(eventos):
+    trechos = []
+    for (time_, jogador), linha in contagens_por_jogador(eventos).iterrows():
+        partes = [f"{int(linha[metrica])} {nome}" for metrica, nome in [
+            ("gols", "gols"), ("assistencias", "assistências"), ("passes", "passes"), ("finalizacoes", "finalizações"),
+            ("cartoes_amarelos", "cartões amarelos"), ("cartoes_vermelhos", "cartões vermelhos"),
+            ("desarmes_totais", "desarmes"), ("duelos_ganhos", "duelos ganhos"),
+            ("interceptacoes_bem_sucedidas", "interceptações"), ("falhas_recuperacao_bola", "falhas de recuperação"),
+        ] if linha[metrica]]
+        if partes:
+            trechos.append(f"{jogador} ({time_}): {', '.join(partes)}")
+    return trechos
+
+
+def trechos_janelas(eventos, minutos=MINUTOS_JANELA):
+    """Um trecho por time, período e janela de `minutos`, com a contagem de cada tipo de evento."""
+    colunas = {"team", "type", "period", "minute"}
+    if eventos.empty or not colunas <= set(eventos.columns):
+        return []
+    tabela = pd.DataFrame({
+        "team": eventos["team"].astype(object), "type": eventos["type"].astype(object),
+        "period": eventos["period"], "janela": eventos["minute"] // minutos * minutos,
+    }).dropna()
+    contagens = tabela.groupby(["team", "period", "janela", "type"]).size()
+    trechos = []
+    for (time_, periodo, janela), tipos in contagens.groupby(level=[0, 1, 2]):
+        tipos = tipos.droplevel([0, 1, 2]).sort_values(ascending=False, kind="stable")
+        descricao = ", ".join(f"{int(n)} {tipo}" for tipo, n in tipos.items())
+        trechos.append(f"{time_}, {int(periodo)}º tempo, minutos {int(janela)}-{int(janela) + minutos}: {descricao}")
+    return trechos
+
+
+def trechos_partida(eventos, partida=None, escalacoes=None):
+    """Textos curtos de uma partida para o índice: dados da partida, totais por time, cada jogador,
+    eventos-chave, escalações e o que cada time fez em cada janela de tempo."""
+    trechos = [secao_partida(partida)]
+    trechos += secao_times(eventos).splitlines()
+    trechos += trechos_jogadores(eventos)
+    trechos += secao_eventos_chave(eventos, limite=len(eventos)).splitlines()
+    trechos += secao_escalacoes(escalacoes).splitlines()
+    trechos += trechos_janelas(eventos)
+    return [trecho for trecho in trechos if trecho]
+
+
+def trechos_temporada(partidas):
+    return [
+        f"Partida {p.match_id}: {p.home_team} {p.home_score} x {p.away_score} {p.away_team} ({p.match_date})"
+        for p in partidas.sort_values(["match_date", "match_id"]).itertuples()
+    ]
+
+
+def indice_partida(match_id, carregar_dados, modelo=None):
+    """`carregar_dados()` devolve (eventos, partida, escalacoes) e só é chamada se o índice ainda não existe."""
+    return indice(f"partida_{int(match_id)}", lambda: trechos_partida(*carregar_dados()), modelo)
+
+
+def indice_temporada(competition_id, season_id, partidas, modelo=None):
+    return indice(f"temporada_{int(competition_id)}_{int(season_id)}", lambda: trechos_temporada(partidas), modelo)
+
+
+def buscar(pergunta, indices, k=TOP_K, modelo=None):
+    """Os k trechos mais relevantes para a pergunta, somando os resultados de todos os índices."""
+    consulta = (modelo or embeddings()).embed_query(pergunta)
+    resultados = [resultado for indice_ in indices for resultado in indice_.buscar(consulta, k)]
+    resultados.sort(key=lambda resultado: -resultado[0])
+    return [texto for _, texto in resultados[:k]]
@@ -0,0 +1,25 @@
+import json
+
+
+def evento_sse(evento, dados):
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def ler_eventos_sse(linhas):
+    """Lê um stream Server-Sent Events (linha a linha) e devolve pares (evento, dados)."""
+    evento, dados = "message", []
+    for linha in linhas:
+        if linha is None:
+            continue
+        if isinstance(linha, bytes):
+            linha = linha.decode("utf-8")
+        if linha == "":
+            if dados:
+                yield evento, json.loads("\n".join(dados))
+            evento, dados = "message", []
+        elif linha.startswith("event:"):
+            evento = linha[len("event:"):].strip()
+        elif linha.startswith("data:"):
+            dados.append(linha[len("data:"):].strip())
+    if dados:
+        yield evento, json.loads("\n".join(dados))
@@ -0,0 +1,146 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from comum import armazenamento
+from comum.agregacao import contagens_por_jogador, identificar_eventos_por_time
+from comum.eventos import sb_eventos_partida
+
+METRICAS_TIME = ["gols", "assistencias", "cartoes_amarelos", "cartoes_vermelhos", "desarmes_totais",
+                 "duelos_ganhos", "interceptacoes_bem_sucedidas", "falhas_recuperacao_bola"]
+METRICAS_JOGADOR = ["gols", "assistencias", "cartoes_amarelos", "cartoes_vermelhos", "duelos_ganhos"]
+
+
+def agregar_partida(match_id):
+    """Agrega uma partida em um dicionário simples (serializável em JSON) para ser somado depois."""
+    eventos = sb_eventos_partida(match_id)
+    times = {}
+    for time_, dados in identificar_eventos_por_time(eventos).items():
+        times[time_] = {
+            "gols": int(dados["gols"].sum()),
+            "assistencias": int(dados["assistencias"].sum()),
+            "cartoes_amarelos": dados["cartoes_amarelos"],
+            "cartoes_vermelhos": dados["cartoes_vermelhos"],
+            "desarmes_totais": dados["desarmes_totais"],
+            "duelos_ganhos": dados["duelos_ganhos"],
+            "interceptacoes_bem_sucedidas": dados["interceptacoes_bem_sucedidas"],
+            "falhas_recuperacao_bola": dados["falhas_recuperacao_bola"],
+        }
+    jogadores = [
+        {"team": time_, "player": jogador, **{metrica: int(linha[metrica]) for metrica in METRICAS_JOGADOR}}
+        for (time_, jogador), linha in contagens_por_jogador(eventos)[METRICAS_JOGADOR].iterrows()
+        if linha.any()
+    ]
+    return {"match_id": int(match_id), "times": times, "jogadores": jogadores}
+
+
+def juntar_parciais(parciais):
+    times = {}
+    jogadores = {}
+    for parcial in parciais:
+        for time_, contagens in parcial["times"].items():
+            total = times.setdefault(time_, {"team": time_, "partidas": 0, **{m: 0 for m in METRICAS_TIME}})
+            total["partidas"] += 1
+            for metrica in METRICAS_TIME:
+                total[metrica] += contagens[metrica]
+        for linha in parcial["jogadores"]:
+            chave = (linha["team"], linha["player"])
+            total = jogadores.setdefault(chave, {"team": linha["team"], "player": linha["player"], **{m: 0 for m in METRICAS_JOGADOR}})
+            for metrica in METRICAS_JOGADOR:
+                total[metrica] += linha[metrica]
+    return {"times": list(times.values()), "jogadores": list(jogadores.values())}
+
+
+def classificacoes(resultado, top=10):
+    """Monta os rankings por métrica (times e jogadores) a partir do resultado agregado."""
+    def ranking(linhas, metrica, chaves):
+        ordenadas = sorted((l for l in linhas if l[metrica] > 0), key=lambda l: (-l[metrica], l[chaves[-1]]))
+        return [{**{c: l[c] for c in chaves}, metrica: l[metrica]} for l in ordenadas[:top]]
+
+    return {
+        "times": {m: ranking(resultado["times"], m, ["team"]) for m in METRICAS_TIME},
+        "jogadores": {m: ranking(resultado["jogadores"], m, ["team", "player"]) for m in METRICAS_JOGADOR},
+    }
+
+
+def _diretorio_parciais(competition_id, season_id):
+    return os.path.join(armazenamento.DIRETORIO_CACHE, "temporadas", f"{int(competition_id)}_{int(season_id)}")
+
+
+def agregar_temporada(competition_id, season_id, workers=None, progresso=None):
+    """Agrega todas as partidas de uma competição/temporada em um pool de processos.
+
+    O resultado de cada partida é salvo assim que fica pronto, então uma execução interrompida
+    continua de onde parou sem refazer as partidas já agregadas.
+    """
+    partidas = armazenamento.carregar_partidas(competition_id, season_id)
+    match_ids = sorted(int(m) for m in partidas["match_id"])
+    diretorio = _diretorio_parciais(competition_id, season_id)
+    os.makedirs(diretorio, exist_ok=True)
+
+    parciais = {}
+    for match_id in match_ids:
+        caminho = os.path.join(diretorio, f"{match_id}.json")
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as arquivo:
+                parciais[match_id] = json.load(arquivo)
+
+    pendentes = [m for m in match_ids if m not in parciais]
+    erros = {}
+    if pendentes:
+        # spawn: o pool pode ser criado de dentro da API, que já tem threads rodando (fork não é seguro aí).
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=contexto) as pool:
+            futuros = {pool.submit(agregar_partida, match_id): match_id for match_id in pendentes}
+            for futuro in as_completed(futuros):
+                match_id = futuros[futuro]
+                try:
+                    parciais[match_id] = futuro.result()
+                    armazenamento.salvar_json(parciais[match_id], os.path.join(diretorio, f"{match_id}.json"))
+                except Exception as e:
+                    erros[match_id] = str(e)
+                if progresso:
+                    progresso(len(parciais) + len(erros), len(match_ids), match_id)
+
+    resultado = juntar_parciais(parciais[m] for m in match_ids if m in parciais)
+    resultado.update({
+        "competition_id": int(competition_id),
+        "season_id": int(season_id),
+        "partidas": len(parciais),
+        "partidas_com_erro": erros,
+    })
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrega os eventos de todas as partidas de uma temporada.")
+    parser.add_argument("competition_id", type=int)
+    parser.add_argument("season_id", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos em paralelo (padrão: todos os núcleos)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--saida", help="arquivo JSON para salvar o resultado completo")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    agregadas_agora = 0
+
+    def progresso(feitas, total, match_id):
+        nonlocal agregadas_agora
+        agregadas_agora += 1
+        decorrido = time.perf_counter() - inicio
+        print(f"[{feitas}/{total}] partida {match_id} ({agregadas_agora / decorrido:.1f} partidas/s)", file=sys.stderr)
+
+    resultado = agregar_temporada(args.competition_id, args.season_id, args.workers, progresso)
+    if args.saida:
+        armazenamento.salvar_json(resultado, args.saida)
+    print(json.dumps(classificacoes(resultado, args.top), ensure_ascii=False, indent=2))
+    if resultado["partidas_com_erro"]:
+        print(f"{len(resultado['partidas_com_erro'])} partidas com erro: {resultado['partidas_com_erro']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
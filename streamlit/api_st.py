@@ -1,7 +1,21 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum import DIRETORIO_RAIZ
+from comum.streaming import ler_eventos_sse
+
+@st.cache_resource
+def sessao_api():
+    """Sessão HTTP compartilhada (conexões reaproveitadas) com cache local que segue o Cache-Control/ETag da API:
+    dentro do max-age a resposta sai do disco; depois disso é revalidada com If-None-Match (304)."""
+    import requests_cache
+    return requests_cache.CachedSession(
+        os.path.join(DIRETORIO_RAIZ, "cache", "api_st"),
+        backend="sqlite",
+        cache_control=True,
+        urls_expire_after={"*/team_events/stream": requests_cache.DO_NOT_CACHE},
+    )
 
 def run_page():
     BASE_URL = "http://127.0.0.1:8000" 
@@ -24,7 +38,7 @@ def run_page():
                 "match_id": match_id
             }
             try:
-                response = requests.get(f"{BASE_URL}/match_summary", params=params)
+                response = sessao_api().get(f"{BASE_URL}/match_summary", params=params)
                 if response.status_code == 200:
                     st.json(response.json())
                 else:
@@ -43,7 +57,7 @@ def run_page():
                 "player_id": player_id
             }
             try:
-                response = requests.get(f"{BASE_URL}/player_profile", params=params)
+                response = sessao_api().get(f"{BASE_URL}/player_profile", params=params)
                 if response.status_code == 200:
                     st.json(response.json())
                 else:
@@ -66,13 +80,24 @@ def run_page():
                 "narration_style": narration_style
             }
             try:
-                response = requests.get(f"{BASE_URL}/team_events", params=params)
+                response = sessao_api().get(f"{BASE_URL}/team_events/stream", params=params, stream=True)
                 if response.status_code == 200:
-                    data = response.json()
-                    st.subheader("Resumo dos Eventos")
-                    st.json(data["events_summary"])
+                    eventos = ler_eventos_sse(response.iter_lines(decode_unicode=True))
+                    for evento, dados in eventos:
+                        if evento == "summary":
+                            st.subheader("Resumo dos Eventos")
+                            st.json(dados)
+                            break
+
+                    def trechos():
+                        for evento, dados in eventos:
+                            if evento == "token":
+                                yield dados["text"]
+                            elif evento == "error":
+                                st.error(dados["detail"])
+
                     st.subheader("Narração")
-                    st.write(data["narration"])
+                    st.write_stream(trechos())
                 else:
                     st.error(f"Erro: {response.status_code} - {response.json()['detail']}")
             except Exception as e:
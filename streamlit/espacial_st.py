@@ -0,0 +1,94 @@
+import streamlit as st
+import matplotlib.pyplot as plt
+import os
+import sys
+import warnings
+
+warnings.filterwarnings("ignore", category=UserWarning)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum import espacial
+from comum.eventos import sb_eventos_partida
+
+TTL_CACHE = int(os.environ.get("STREAMLIT_CACHE_TTL", "3600"))
+
+@st.cache_data(ttl=TTL_CACHE, show_spinner="Calculando mapas da partida...")
+def analises_partida(partida_id):
+    # Tudo de uma vez por partida: os mapas, zonas e redes são pequenos e as trocas de time/jogador
+    # na tela viram só leituras de dicionário.
+    eventos = sb_eventos_partida(partida_id)
+    if eventos.empty:
+        return None
+    times = [str(t) for t in eventos["team"].dropna().unique()]
+    jogadores_por_time = {t: sorted(str(j) for j in eventos.loc[eventos["team"] == t, "player"].dropna().unique()) for t in times}
+    return {
+        "times": times,
+        "jogadores": jogadores_por_time,
+        "mapas_times": espacial.mapa_calor(eventos, "team"),
+        "mapas_jogadores": espacial.mapa_calor(eventos, "player"),
+        "zonas": espacial.contagem_zonas(eventos, "team"),
+        "redes": {t: espacial.rede_passes(eventos, t) for t in times},
+    }
+
+def desenhar_campo(ax):
+    ax.plot([0, 0, 120, 120, 0], [0, 80, 80, 0, 0], color="black", linewidth=1)
+    ax.plot([60, 60], [0, 80], color="black", linewidth=1)
+    for x0, x1 in [(0, 18), (120, 102)]:
+        ax.plot([x0, x1, x1, x0], [18, 18, 62, 62], color="black", linewidth=1)
+    ax.add_patch(plt.Circle((60, 40), 10, fill=False, color="black", linewidth=1))
+    ax.set_xlim(-2, 122)
+    ax.set_ylim(82, -2)
+    ax.set_aspect("equal")
+    ax.axis("off")
+
+def mostrar_mapa(matriz, titulo):
+    fig, ax = plt.subplots(figsize=(10, 7))
+    ax.imshow(matriz.T, extent=[0, espacial.COMPRIMENTO, espacial.LARGURA, 0], cmap="YlOrRd", alpha=0.8)
+    desenhar_campo(ax)
+    ax.set_title(titulo)
+    st.pyplot(fig)
+
+def mostrar_rede(nos, arestas, titulo):
+    fig, ax = plt.subplots(figsize=(10, 7))
+    posicoes = nos.set_index("player")[["x", "y"]]
+    maximo = max(arestas["passes"].max(), 1) if not arestas.empty else 1
+    for aresta in arestas.itertuples():
+        origem, destino = posicoes.loc[aresta.origem], posicoes.loc[aresta.destino]
+        ax.plot([origem.x, destino.x], [origem.y, destino.y], color="steelblue", alpha=0.6, linewidth=1 + 6 * aresta.passes / maximo)
+    ax.scatter(nos["x"], nos["y"], s=100 + 10 * nos["passes"], color="navy", zorder=3)
+    for no in nos.itertuples():
+        ax.annotate(no.player, (no.x, no.y), textcoords="offset points", xytext=(0, 10), ha="center", fontsize=8)
+    desenhar_campo(ax)
+    ax.set_title(titulo)
+    st.pyplot(fig)
+
+st.title("Análise Espacial - StatsBomb")
+
+partida_id = st.text_input("Digite o ID da partida:")
+if partida_id:
+    try:
+        analises = analises_partida(int(partida_id))
+    except Exception as e:
+        st.error(f"Erro ao carregar a partida: {e}")
+        analises = None
+
+    if analises is None:
+        st.warning("Nenhum evento encontrado para a partida.")
+    else:
+        time_ = st.radio("Time:", analises["times"], horizontal=True)
+        jogador = st.selectbox("Jogador:", ["Todos"] + analises["jogadores"][time_])
+
+        st.subheader("Mapa de calor")
+        if jogador == "Todos":
+            mostrar_mapa(analises["mapas_times"][time_], f"Ações de {time_}")
+        elif jogador in analises["mapas_jogadores"]:
+            mostrar_mapa(analises["mapas_jogadores"][jogador], f"Ações de {jogador}")
+        else:
+            st.write("Jogador sem ações com localização.")
+
+        st.subheader("Ações por terço do campo")
+        st.dataframe(analises["zonas"].set_index("team"))
+
+        st.subheader("Rede de passes")
+        minimo = st.slider("Mínimo de passes entre dois jogadores:", 1, 10, 3)
+        nos, arestas = analises["redes"][time_]
+        mostrar_rede(nos, arestas[arestas["passes"] >= minimo], f"Rede de passes de {time_}")
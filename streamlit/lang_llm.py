@@ -1,102 +1,39 @@
 import streamlit as st
-from statsbombpy import sb
-from langchain.schema import Document
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI
-from langchain.agents import initialize_agent, Tool, AgentType
 import os
-import pandas as pd
+import sys
 from dotenv import load_dotenv
 load_dotenv('../.env')
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum.cache import CacheTTL
 
-llm = GoogleGenerativeAI(model="gemini-1.5-flash", api_key=os.environ['GEMINI_KEY'])
+# O langchain (e o LLM dele, em comum/langchain_llm.py) só é importado quando a primeira pergunta chega, e os
+# módulos de dados (pandas, pyarrow, statsbombpy) só nas funções que os usam: abrir a página e as
+# reexecuções do script não pagam por eles.
 
+TTL_CACHE = int(os.environ.get("STREAMLIT_CACHE_TTL", "3600"))
+
+@st.cache_data(ttl=TTL_CACHE)
 def matches(competition_id, season_id):
-    partidas = sb.matches(competition_id=competition_id, season_id=season_id)
+    from comum import armazenamento
+    partidas = armazenamento.carregar_partidas(competition_id, season_id)
     return partidas
 
-def events(match_id):
-    event = sb.events(match_id=match_id)
-    return event
-
-def sb_eventos_partida(partida_id):
-    eventos = sb.events(match_id=partida_id)
-    if 'location' in eventos.columns:
-        eventos_validos = eventos[eventos['location'].apply(lambda x: isinstance(x, list) and len(x) == 2)]
-        if not eventos_validos.empty:
-            eventos_validos.loc[:, ['localizacao_x', 'localizacao_y']] = pd.DataFrame(eventos_validos['location'].tolist(), index=eventos_validos.index)
-            eventos = eventos_validos
-    return eventos
-
+@st.cache_data(ttl=TTL_CACHE)
 def lineups(match_id):
-    lineup = sb.lineups(match_id=match_id)
+    from comum import armazenamento
+    lineup = armazenamento.carregar_escalacoes(match_id)
     return lineup
 
-def identificar_eventos_por_time(eventos_df):
-    times = eventos_df['team'].unique()
-    eventos_times = {}
-
-    for time in times:
-        eventos_time = eventos_df[eventos_df['team'] == time]
-
-        gols = eventos_time[(eventos_time['type'] == 'Shot') & (eventos_time['shot_outcome'] == 'Goal')]
-        gols_por_jogador = gols.groupby('player').size()
-        
-        assistencias = eventos_time[eventos_time['pass_goal_assist'] == True]
-        assistencias_por_jogador = assistencias.groupby('player').size()
-
-        passes = eventos_time[eventos_time['type'] == 'Pass']
-        passes_por_jogador = passes.groupby('player').size() if not passes.empty else {}
-
-        finalizacoes = eventos_time[eventos_time['type'] == 'Shot']
-        finalizacoes_por_jogador = finalizacoes.groupby('player').size()
-        
-        cartões_amarelos = eventos_time[ 
-            (eventos_time['bad_behaviour_card'] == 'Yellow Card') | (eventos_time['foul_committed_card'] == 'Yellow Card')
-        ]
-        cartões_vermelhos = eventos_time[ 
-            (eventos_time['bad_behaviour_card'] == 'Red Card') | (eventos_time['foul_committed_card'] == 'Red Card')
-        ]
-        total_cartoes_amarelos = len(cartões_amarelos)
-        total_cartoes_vermelhos = len(cartões_vermelhos)
-
-        desarmes = eventos_time[eventos_time['type'] == 'Duel']
-        duelos_ganhos = desarmes[desarmes['duel_outcome'] == 'Won'] if 'duel_outcome' in desarmes.columns else desarmes
-        interceptacoes = eventos_time[eventos_time['type'] == 'Interception']
-        interceptacoes_bem_sucedidas = interceptacoes[interceptacoes['interception_outcome'] == 'Won'] if 'interception_outcome' in interceptacoes.columns else interceptacoes
-        recuperacoes_bola = eventos_time[eventos_time['type'] == 'Ball Recovery']
-        falhas_recuperacao = recuperacoes_bola[recuperacoes_bola['ball_recovery_recovery_failure'] == True] if 'ball_recovery_recovery_failure' in recuperacoes_bola.columns else None
-
-        eventos_times[time] = {
-            "gols": gols_por_jogador,
-            "assistencias": assistencias_por_jogador,
-            "passes": passes_por_jogador,
-            "finalizacoes": finalizacoes_por_jogador,
-            "cartoes_amarelos": total_cartoes_amarelos,
-            "cartoes_vermelhos": total_cartoes_vermelhos,
-            "desarmes_totais": len(desarmes),
-            "duelos_ganhos": len(duelos_ganhos),
-            "interceptacoes_bem_sucedidas": len(interceptacoes_bem_sucedidas),
-            "falhas_recuperacao_bola": len(falhas_recuperacao) if falhas_recuperacao is not None else 0
-        }
-    
-    return eventos_times
-
-def partidas_para_texto(competition_id, season_id):
-    partidas = matches(competition_id, season_id)
-    if partidas.empty:
-        return "Nenhuma partida encontrada para os parâmetros fornecidos."
-    
-    texto_partidas = ""
-    for _, partida in partidas.iterrows():
-        texto_partidas += (
-            f"Partida ID: {partida['match_id']} - {partida['home_team']} vs {partida['away_team']} "
-            f"no estádio {partida['stadium']} em {partida['match_date']}\n"
-        )
-    return texto_partidas
+@st.cache_resource
+def cache_agentes():
+    # cache_resource: o streamlit reexecuta o script a cada interação, então o cache precisa viver fora dele.
+    return CacheTTL(int(os.environ.get("AGENTES_CACHE_MAX", "8")), float(os.environ.get("AGENTES_CACHE_TTL", "1800")))
 
-def gerar_resposta_com_agente(match_id, pergunta):
+def criar_agente(match_id):
+    from langchain.agents import initialize_agent, Tool, AgentType
+    from comum.agregacao import identificar_eventos_por_time
+    from comum.eventos import sb_eventos_partida
+    from comum.langchain_llm import llm
     eventos = sb_eventos_partida(match_id)
     eventos_times = identificar_eventos_por_time(eventos)
     passes_geral = {}
@@ -104,9 +41,7 @@ def gerar_resposta_com_agente(match_id, pergunta):
     finalizacao_geral = {}
     for time, dados in eventos_times.items():
         passes_geral[time] = dados['passes']
-    for time, dados in eventos_times.items():
         gols_geral[time] = dados['gols']
-    for time, dados in eventos_times.items():
         finalizacao_geral[time] = dados['finalizacoes']
 
     tools = [
@@ -126,12 +61,45 @@ def gerar_resposta_com_agente(match_id, pergunta):
             description="Analisando as finalizações feitas pelos jogadores"
         )
     ]
-    
-    agent = initialize_agent(
-        tools, llm, agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=True, max_iterations=20
+
+    return initialize_agent(
+        tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=True,
+        max_iterations=int(os.environ.get("AGENTE_MAX_ITERACOES", "10")), return_intermediate_steps=True
     )
-    resposta = agent.run(pergunta)
-    return resposta
+
+def gerar_resposta_com_agente(match_id, pergunta):
+    from comum.langchain_llm import ContadorChamadasLLM
+    agentes = cache_agentes()
+    agent = agentes.obter_ou_calcular(int(match_id), criar_agente, int(match_id))
+
+    contador = ContadorChamadasLLM()
+    resultado = agent.invoke({"input": pergunta}, config={"callbacks": [contador]})
+    metricas = {
+        "match_id": int(match_id),
+        "iteracoes": len(resultado["intermediate_steps"]),
+        "chamadas_llm": contador.chamadas,
+        "agentes_em_cache": len(agentes),
+        "taxa_acerto_cache": agentes.estatisticas()["taxa_acerto"],
+    }
+    st.session_state["metricas_agente"] = metricas
+    return resultado["output"]
+
+def trechos_relevantes(competition_id, season_id, match_id, pergunta):
+    # Os índices são construídos na primeira pergunta sobre a partida/temporada e depois só abertos do disco.
+    from comum import recuperacao
+    from comum.eventos import sb_eventos_partida
+    partidas = matches(competition_id, season_id)
+
+    def dados_partida():
+        linha = partidas[partidas["match_id"] == int(match_id)]
+        partida = linha.iloc[0].to_dict() if not linha.empty else None
+        return sb_eventos_partida(match_id), partida, lineups(match_id)
+
+    indices = [
+        recuperacao.indice_partida(match_id, dados_partida),
+        recuperacao.indice_temporada(competition_id, season_id, partidas),
+    ]
+    return recuperacao.buscar(pergunta, indices)
 
 def gerar_resposta(competition_id, season_id, match_id, pergunta):
     palavras_chave_especificas = ["passes", "gols", "finalizações"]
@@ -139,18 +107,20 @@ def gerar_resposta(competition_id, season_id, match_id, pergunta):
     if any(palavra in pergunta.lower() for palavra in palavras_chave_especificas):
         return gerar_resposta_com_agente(match_id, pergunta)
     else:
-        texto_partidas = partidas_para_texto(competition_id, season_id)
-        lines = lineups(match_id)
-        event = events(match_id)
-        eventos = sb_eventos_partida(match_id)
-        eventos_agrupados = identificar_eventos_por_time(eventos)
-        
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+        from comum.contexto import montar_contexto
+        from comum.langchain_llm import llm
+        # Os trechos vêm do mais relevante ao menos; os que não cabem no orçamento de tokens ficam de fora.
+        trechos = trechos_relevantes(competition_id, season_id, match_id, pergunta)
+        contexto, _ = montar_contexto([(None, trecho) for trecho in trechos])
+
         prompt = PromptTemplate(
-            input_variables=["dados_partidas"],
+            input_variables=["dados_partidas", "input"],
             template="Baseado nos seguintes dados:\n\n{dados_partidas}\n\nPergunta:{input}"
         )
         chain = LLMChain(llm=llm, prompt=prompt)
-        resposta = chain.run(dados_partidas=[texto_partidas, lines, event, eventos_agrupados], input=pergunta)
+        resposta = chain.run(dados_partidas=contexto, input=pergunta)
         return resposta
 
 def app():
@@ -165,6 +135,9 @@ def app():
         resposta = gerar_resposta(competition_id, season_id, match_id, pergunta)
         st.subheader("Resposta do Modelo:")
         st.write(resposta)
+        metricas = st.session_state.pop("metricas_agente", None)
+        if metricas:
+            st.caption(f"Iterações do agente: {metricas['iteracoes']} · chamadas ao LLM: {metricas['chamadas_llm']}")
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -1,25 +1,43 @@
 import streamlit as st
-from statsbombpy import sb
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from comum import armazenamento
+from comum.eventos import sb_eventos_partida
+from comum.jogadores import estatisticas_jogadores, estatisticas_por_nome
 
 
+# Os dados de disco ficam no Parquet do comum/armazenamento (um processo novo já começa com eles salvos);
+# o cache_data evita até a leitura do Parquet e o agrupamento nas reexecuções do script.
+TTL_CACHE = int(os.environ.get("STREAMLIT_CACHE_TTL", "3600"))
+
+@st.cache_data(ttl=TTL_CACHE, show_spinner="Carregando partidas...")
+def carregar_partidas(competition_id, season_id):
+    return armazenamento.carregar_partidas(competition_id, season_id)
+
+@st.cache_data(ttl=TTL_CACHE, show_spinner="Carregando eventos...")
+def carregar_jogadores(match_id):
+    # Guarda só a tabela de estatísticas e a lista de jogadores: o cache_data copia o valor a cada leitura
+    # e copiar o DataFrame de eventos inteiro a cada interação custaria quase o mesmo que relê-lo.
+    events = sb_eventos_partida(match_id)
+    return estatisticas_por_nome(estatisticas_jogadores(events)), np.asarray(events['player'].dropna().unique()).tolist()
+
 def load_match_data(competition_id, season_id):
     try:
-        matches = sb.matches(competition_id=competition_id, season_id=season_id)
+        matches = carregar_partidas(competition_id, season_id)
         return matches
     except Exception as e:
         st.error(f"Erro ao carregar dados das partidas: {e}")
         return pd.DataFrame()
 
-def load_events_data(match_id):
+def load_player_data(match_id):
     try:
-        events = sb.events(match_id=match_id)
-        return events
+        return carregar_jogadores(match_id)
     except Exception as e:
         st.error(f"Erro ao carregar dados dos eventos: {e}")
-        return pd.DataFrame()
+        return {}, []
 
 def display_match_summary(match):
     try:
@@ -34,24 +52,17 @@ def display_match_summary(match):
     except TypeError as e:
         st.error(f"Erro de tipo ao acessar informações da partida: {str(e)}")
 
-def display_player_profile(events, player_id):
+def display_player_profile(estatisticas, player_id):
     try:
-        player_events = events[events['player'] == player_id]
-        
-        passes = len(player_events[player_events['type'] == 'Pass'])
-        shots = len(player_events[player_events['type'] == 'Shot'])
-        tackles = len(player_events[player_events['type'] == 'Tackle'])
-        
-        goals = len(player_events[(player_events['type'] == 'Shot') & 
-                                (player_events['shot_outcome'].notna()) & 
-                                (player_events['shot_outcome'] == 'Goal')])
-        
-        yellow_cards = len(player_events[(player_events['type'] == 'Foul Committed') & 
-                                        (player_events['foul_committed_card'] == 'Yellow Card')])
-        red_cards = len(player_events[(player_events['type'] == 'Foul Committed') & 
-                                    (player_events['foul_committed_card'] == 'Red Card')])
+        jogador = estatisticas.get(player_id, {})
 
-        minutes_played = player_events['minute'].max() - player_events['minute'].min() if len(player_events) > 0 else 0
+        passes = jogador.get('passes', 0)
+        shots = jogador.get('shots', 0)
+        tackles = jogador.get('tackles', 0)
+        goals = jogador.get('goals', 0)
+        yellow_cards = jogador.get('yellow_cards', 0)
+        red_cards = jogador.get('red_cards', 0)
+        minutes_played = jogador.get('minutes_played', 0)
 
         st.write(f"**Jogador:** {player_id}")
         st.write(f"**Passes:** {passes}")
@@ -70,6 +81,7 @@ def display_player_profile(events, player_id):
             'C.Amarelos': yellow_cards,
             'C.Vermelhos': red_cards
         }
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.bar(stats.keys(), stats.values(), color='skyblue')
         ax.set_ylabel('Número de Ações')
@@ -79,26 +91,21 @@ def display_player_profile(events, player_id):
     except Exception as e:
         st.error(f"Erro ao acessar o perfil do jogador: {str(e)}")
 
-def compare_players(events, player1_id, player2_id):
+def compare_players(estatisticas, player1_id, player2_id):
     try:
-        player1_events = events[events['player'] == player1_id]
-        player2_events = events[events['player'] == player2_id]
-        
-        player1_stats = {
-            'Passes': len(player1_events[player1_events['type'] == 'Pass']),
-            'Finalizações': len(player1_events[player1_events['type'] == 'Shot']),
-            'Gols': len(player1_events[(player1_events['type'] == 'Shot') & (player1_events['shot_outcome'] == 'Goal')]),
-            'Desarmes': len(player1_events[player1_events['type'] == 'Tackle'])
-        }
-
-        player2_stats = {
-            'Passes': len(player2_events[player2_events['type'] == 'Pass']),
-            'Finalizações': len(player2_events[player2_events['type'] == 'Shot']),
-            'Gols': len(player2_events[(player2_events['type'] == 'Shot') & (player2_events['shot_outcome'] == 'Goal')]),
-            'Desarmes': len(player2_events[player2_events['type'] == 'Tackle'])
-        }
-        
-
+        def stats_jogador(player_id):
+            jogador = estatisticas.get(player_id, {})
+            return {
+                'Passes': jogador.get('passes', 0),
+                'Finalizações': jogador.get('shots', 0),
+                'Gols': jogador.get('goals', 0),
+                'Desarmes': jogador.get('tackles', 0)
+            }
+
+        player1_stats = stats_jogador(player1_id)
+        player2_stats = stats_jogador(player2_id)
+
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots()
         width = 0.4
         x = range(len(player1_stats))
@@ -139,21 +146,20 @@ def main():
         st.subheader("Resumo da Partida")
         display_match_summary(selected_match)
 
-        events = load_events_data(match_id)
-        if not events.empty:
-            players = events['player'].unique()
+        estatisticas, players = load_player_data(match_id)
+        if players:
             player_id = st.selectbox("Selecione um Jogador:", options=players)
 
             if player_id:
                 st.subheader("Perfil do Jogador")
-                display_player_profile(events, player_id)
+                display_player_profile(estatisticas, player_id)
 
             st.subheader("Comparar Jogadores")
             player1_id = st.selectbox("Selecione o 1º Jogador para Comparação:", options=players)
             player2_id = st.selectbox("Selecione o 2º Jogador para Comparação:", options=players)
 
             if player1_id and player2_id:
-                compare_players(events, player1_id, player2_id)
+                compare_players(estatisticas, player1_id, player2_id)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("API_PRECARREGAR", "0")
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """O módulo da API com os caches em memória vazios (o estado deles é global ao processo)."""
+    from API_FAST import main
+    from comum.cache import CachePartidas
+    from comum.concorrencia import ChamadaUnica
+
+    monkeypatch.setattr(main, "cache_partidas", CachePartidas())
+    monkeypatch.setattr(main, "chamadas", ChamadaUnica())
+    for cache in (main.respostas_http, main.cache_dados, main.cache_espacial):
+        cache.limpar()
+    return main
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from comum import armazenamento
+from comum.cache import CachePartidas, CacheTTL
+
+
+def test_cache_ttl_avisa_os_itens_que_saem():
+    agora = [0.0]
+    removidos = []
+    cache = CacheTTL(2, ttl=10, relogio=lambda: agora[0], ao_remover=lambda chave, valor: removidos.append((chave, valor)))
+
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.guardar("c", 3)
+    assert removidos == [("a", 1)]
+
+    agora[0] = 11
+    assert cache.obter("b") is None
+    assert removidos == [("a", 1), ("b", 2)]
+
+    cache.remover("c")
+    assert removidos[-1] == ("c", 3)
+
+
+def test_indice_reverso_esquece_temporadas_expulsas(monkeypatch):
+    def carregar_partidas(competition_id, season_id):
+        return pd.DataFrame({"match_id": [competition_id * 100 + season_id * 10 + i for i in range(3)]})
+
+    monkeypatch.setattr(armazenamento, "carregar_partidas", carregar_partidas)
+    cache = CachePartidas(max_temporadas=2, ttl=0)
+
+    cache.partidas(1, 1)
+    cache.partidas(1, 2)
+    assert cache.partida_em_memoria(110) == {"match_id": 110}  # (1, 1) passa a ser a usada mais recentemente
+    cache.partidas(1, 3)
+
+    assert cache.partida_em_memoria(120) is None
+    assert set(cache._temporada_da_partida.values()) == {(1, 1), (1, 3)}
+    assert len(cache._temporada_da_partida) == 6
+    assert cache.temporadas.estatisticas()["acertos"] == 1
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from comum import temporada
+
+PARAMETROS = {"competition_id": 43, "season_id": 3}
+
+
+def resultado_temporada(erros):
+    return {"times": [], "jogadores": [], "partidas": 64 - len(erros), "partidas_com_erro": erros}
+
+
+def test_ranking_parcial_nao_fica_no_cache(api, monkeypatch):
+    respostas = [resultado_temporada({7585: "503 do StatsBomb"}), resultado_temporada({}), resultado_temporada({})]
+    chamadas = []
+
+    def agregar_temporada(competition_id, season_id, workers=None):
+        chamadas.append((competition_id, season_id))
+        return respostas[len(chamadas) - 1]
+
+    monkeypatch.setattr(temporada, "agregar_temporada", agregar_temporada)
+    cliente = TestClient(api.app)
+
+    parcial = cliente.get("/season_leaderboard", params=PARAMETROS)
+    assert parcial.status_code == 200
+    assert parcial.json()["failed_matches"] == {"7585": "503 do StatsBomb"}
+    assert parcial.headers["cache-control"] == f"public, max-age={api.CACHE_MAX_AGE_PARCIAL}"
+    assert "etag" not in parcial.headers
+
+    completo = cliente.get("/season_leaderboard", params=PARAMETROS)
+    assert completo.json()["failed_matches"] == {}
+    assert completo.headers["cache-control"] == f"public, max-age={api.CACHE_MAX_AGE}"
+
+    de_novo = cliente.get("/season_leaderboard", params=PARAMETROS, headers={"If-None-Match": completo.headers["etag"]})
+    assert de_novo.status_code == 304
+    assert len(chamadas) == 2
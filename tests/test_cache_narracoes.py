@@ -0,0 +1,101 @@
+import pytest
+
+from comum.cache_narracoes import CacheNarracoes
+
+
+class ModeloFalso:
+    """Conta as chamadas e devolve um texto diferente a cada uma."""
+
+    def __init__(self, tamanho=10):
+        self.chamadas = 0
+        self.tamanho = tamanho
+
+    def __call__(self):
+        self.chamadas += 1
+        return str(self.chamadas) * self.tamanho
+
+
+@pytest.fixture
+def relogio():
+    agora = [1000.0]
+    return agora
+
+
+def abrir(tmp_path, relogio, **opcoes):
+    return CacheNarracoes(str(tmp_path / "narracoes.sqlite"), relogio=lambda: relogio[0], **opcoes)
+
+
+def test_acerto_nao_chama_o_modelo(tmp_path, relogio):
+    cache = abrir(tmp_path, relogio)
+    modelo = ModeloFalso()
+
+    primeira = cache.obter_ou_gerar("gemini", "Resumo: 2 x 1", "formal", modelo)
+    segunda = cache.obter_ou_gerar("gemini", "Resumo:   2 x 1 ", "formal", modelo)
+
+    assert primeira == segunda
+    assert modelo.chamadas == 1
+    assert cache.estatisticas()["acertos"] == 1
+    assert cache.estatisticas()["falhas"] == 1
+
+
+def test_chave_inclui_modelo_e_estilo(tmp_path, relogio):
+    cache = abrir(tmp_path, relogio)
+    modelo = ModeloFalso()
+
+    cache.obter_ou_gerar("gemini", "prompt", "formal", modelo)
+    cache.obter_ou_gerar("gemini", "prompt", "técnica", modelo)
+    cache.obter_ou_gerar("outro", "prompt", "formal", modelo)
+
+    assert modelo.chamadas == 3
+    assert cache.estatisticas()["itens"] == 3
+
+
+def test_persiste_entre_instancias(tmp_path, relogio):
+    modelo = ModeloFalso()
+    texto = abrir(tmp_path, relogio).obter_ou_gerar("gemini", "prompt", "formal", modelo)
+
+    assert abrir(tmp_path, relogio).obter_ou_gerar("gemini", "prompt", "formal", modelo) == texto
+    assert modelo.chamadas == 1
+
+
+def test_forcar_gera_de_novo_e_substitui(tmp_path, relogio):
+    cache = abrir(tmp_path, relogio)
+    modelo = ModeloFalso()
+
+    antiga = cache.obter_ou_gerar("gemini", "prompt", "formal", modelo)
+    nova = cache.obter_ou_gerar("gemini", "prompt", "formal", modelo, forcar=True)
+
+    assert nova != antiga
+    assert modelo.chamadas == 2
+    assert cache.obter("gemini", "prompt", "formal") == nova
+
+
+def test_expulsa_as_usadas_ha_mais_tempo_quando_passa_do_limite(tmp_path, relogio):
+    cache = abrir(tmp_path, relogio, max_bytes=25)
+    modelo = ModeloFalso(tamanho=10)
+
+    for prompt in ["a", "b"]:
+        cache.obter_ou_gerar("gemini", prompt, "formal", modelo)
+        relogio[0] += 1
+    cache.obter("gemini", "a", "formal")  # "a" passa a ser a usada mais recentemente
+    relogio[0] += 1
+    cache.obter_ou_gerar("gemini", "c", "formal", modelo)
+
+    assert cache.obter("gemini", "b", "formal") is None
+    assert cache.obter("gemini", "a", "formal") is not None
+    assert cache.obter("gemini", "c", "formal") is not None
+    assert cache.estatisticas()["bytes"] == 20
+
+
+def test_ttl_expirado_gera_de_novo(tmp_path, relogio):
+    cache = abrir(tmp_path, relogio, ttl=60)
+    modelo = ModeloFalso()
+
+    cache.obter_ou_gerar("gemini", "prompt", "formal", modelo)
+    relogio[0] += 59
+    cache.obter_ou_gerar("gemini", "prompt", "formal", modelo)
+    assert modelo.chamadas == 1
+
+    relogio[0] += 2
+    cache.obter_ou_gerar("gemini", "prompt", "formal", modelo)
+    assert modelo.chamadas == 2
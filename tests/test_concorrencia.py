@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import httpx
+import pandas as pd
+
+PARTIDA = {
+    "match_id": 7585, "home_team": "Time A", "away_team": "Time B", "home_score": 2, "away_score": 1,
+    "competition": "Copa", "competition_stage": "Final", "stadium": "Estádio", "referee": "Árbitro",
+    "home_managers": "Técnico A", "away_managers": "Técnico B", "season": "2018", "match_date": "2018-07-15",
+    "kick_off": "17:00:00.000",
+}
+
+
+def test_pedidos_simultaneos_fazem_um_carregamento_sem_travar_o_loop(api, monkeypatch):
+    from comum import armazenamento
+
+    liberar = threading.Event()
+    carregamentos = []
+
+    def carregar_partidas_lento(competition_id, season_id):
+        # Fica preso até o teste liberar, como um download lento do StatsBomb.
+        carregamentos.append((competition_id, season_id))
+        assert liberar.wait(10)
+        return pd.DataFrame([PARTIDA])
+
+    monkeypatch.setattr(armazenamento, "carregar_partidas", carregar_partidas_lento)
+
+    async def cenario():
+        transporte = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+            pedidos = [asyncio.ensure_future(cliente.get("/match_summary", params={"competition_id": 43, "season_id": 3, "match_id": 7585}))
+                       for _ in range(20)]
+            while not carregamentos:
+                await asyncio.sleep(0.01)
+
+            # Com o carregamento em andamento, o event loop continua atendendo outras rotas.
+            metricas = await asyncio.wait_for(cliente.get("/metrics"), 5)
+            assert metricas.status_code == 200
+            assert not any(pedido.done() for pedido in pedidos)
+
+            liberar.set()
+            return await asyncio.gather(*pedidos)
+
+    respostas = asyncio.run(cenario())
+
+    assert carregamentos == [(43, 3)]
+    assert [resposta.status_code for resposta in respostas] == [200] * 20
+    assert all(resposta.json()["home_team"] == "Time A" for resposta in respostas)
+    assert api.chamadas.em_andamento() == 0
+
+
+def test_chamada_unica_repassa_o_erro_para_todos_e_libera_a_chave():
+    from comum.concorrencia import ChamadaUnica
+
+    chamadas = ChamadaUnica()
+    execucoes = []
+
+    def falhar():
+        execucoes.append(1)
+        raise ValueError("falhou")
+
+    async def cenario():
+        return await asyncio.gather(*[chamadas.executar("chave", falhar) for _ in range(5)], return_exceptions=True)
+
+    resultados = asyncio.run(cenario())
+    assert len(execucoes) == 1
+    assert all(isinstance(resultado, ValueError) for resultado in resultados)
+    assert chamadas.em_andamento() == 0
@@ -0,0 +1,35 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from comum import espacial
+
+EVENTOS = pd.DataFrame({
+    "team": ["A", "A", "A", "B", "B"],
+    "type": ["Pass", "Pass", "Shot", "Pass", "Pass"],
+    "localizacao_x": [10.0, 50.0, 110.0, 100.0, None],
+    "localizacao_y": [5.0, 40.0, 75.0, 40.0, 10.0],
+})
+
+
+def test_contagem_zonas_por_terco_e_corredor():
+    zonas = espacial.contagem_zonas(EVENTOS).set_index("team")
+
+    assert zonas.loc["A", ["defensivo", "meio", "ofensivo"]].tolist() == [1, 1, 1]
+    assert zonas.loc["A", "defensivo_esquerdo"] == 1 and zonas.loc["A", "ofensivo_direito"] == 1
+    assert zonas.loc["B", ["defensivo", "meio", "ofensivo"]].tolist() == [0, 0, 1]
+
+
+def test_spatial_zones_bate_com_contagem_zonas(api, monkeypatch):
+    async def carregar_dados_partida(match_id):
+        return {"eventos": EVENTOS}
+
+    monkeypatch.setattr(api, "carregar_dados_partida", carregar_dados_partida)
+
+    resposta = TestClient(api.app).get("/spatial/zones", params={"match_id": 7585})
+
+    assert resposta.status_code == 200
+    esperado = espacial.contagem_zonas(EVENTOS).set_index("team")
+    for zona in resposta.json()["zones"]:
+        linha = esperado.loc[zona["group"]]
+        assert zona["thirds"] == {"defensive": linha["defensivo"], "middle": linha["meio"], "attacking": linha["ofensivo"]}
+        assert zona["grid"] == [[linha[f"{terco}_{corredor}"] for corredor in espacial.CORREDORES] for terco in espacial.TERCOS]
@@ -0,0 +1,50 @@
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from comum import exportacao
+
+
+def eventos_partida(match_id):
+    return pd.DataFrame({"match_id": [match_id] * 3, "team": ["A", "B", "A"], "type": ["Pass", "Shot", "Pass"],
+                         "period": [1, 1, 2]})
+
+
+def test_exporta_uma_partida_de_cada_vez(api, monkeypatch):
+    registro = []
+
+    async def carregar_dados_partida(match_id):
+        registro.append(("carregou", match_id))
+        return {"eventos": eventos_partida(match_id)}
+
+    escrever = exportacao.Exportador.escrever
+
+    def escrever_registrando(self, tabela):
+        registro.append(("escreveu", tabela.column("match_id")[0].as_py()))
+        return escrever(self, tabela)
+
+    monkeypatch.setattr(api, "carregar_dados_partida", carregar_dados_partida)
+    monkeypatch.setattr(exportacao.Exportador, "escrever", escrever_registrando)
+
+    resposta = TestClient(api.app).get("/events/export", params={"match_ids": [1, 2, 3], "columns": "match_id,team,type",
+                                                                  "type": "Pass"})
+
+    assert resposta.status_code == 200
+    # Cada partida é escrita antes da próxima ser carregada.
+    assert registro == [("carregou", 1), ("escreveu", 1), ("carregou", 2), ("escreveu", 2),
+                        ("carregou", 3), ("escreveu", 3)]
+    tabela = pa.ipc.open_stream(resposta.content).read_all()
+    assert tabela.column_names == ["match_id", "team", "type"]
+    assert tabela.column("match_id").to_pylist() == [1, 1, 2, 2, 3, 3]
+    assert set(tabela.column("type").to_pylist()) == {"Pass"}
+
+
+def test_primeira_partida_com_erro_responde_500(api, monkeypatch):
+    async def carregar_dados_partida(match_id):
+        raise KeyError(match_id)
+
+    monkeypatch.setattr(api, "carregar_dados_partida", carregar_dados_partida)
+
+    resposta = TestClient(api.app).get("/events/export", params={"match_ids": [99]})
+
+    assert resposta.status_code == 500
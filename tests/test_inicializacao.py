@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# O import do fastapi/pydantic sozinho varia muito de uma máquina para outra (~0,15 s a ~0,7 s), então o
+# orçamento vale para o que o nosso código acrescenta: o import do main.py medido no mesmo processo, depois
+# do framework. Com pandas/pyarrow/statsbombpy de volta no caminho do import ele passa de 300 ms.
+ORCAMENTO_PROPRIO_MS = float(os.environ.get("ORCAMENTO_API_MS", "150"))
+MODULOS_PESADOS = ["pandas", "pyarrow", "statsbombpy", "google.generativeai"]
+
+_MEDIR = """
+import json, sys, time
+import fastapi, fastapi.responses, pydantic, dotenv
+inicio = time.perf_counter()
+import main
+print(json.dumps({"segundos": time.perf_counter() - inicio, "pesados": [m for m in %r if m in sys.modules]}))
+""" % MODULOS_PESADOS
+
+
+def importar_api():
+    ambiente = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    ambiente.setdefault("GEMINI_KEY", "sem-chave")
+    saida = subprocess.run([sys.executable, "-c", _MEDIR], cwd=os.path.join(RAIZ, "API_FAST"), env=ambiente,
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def test_api_inicia_sem_os_modulos_pesados_e_dentro_do_orcamento():
+    medicoes = [importar_api() for _ in range(3)]
+
+    assert medicoes[0]["pesados"] == []
+    milissegundos = min(medicao["segundos"] for medicao in medicoes) * 1000
+    assert milissegundos <= ORCAMENTO_PROPRIO_MS, f"import do API_FAST/main.py: {milissegundos:.0f} ms"
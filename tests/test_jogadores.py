@@ -0,0 +1,49 @@
+import pandas as pd
+
+from comum.agregacao import identificar_eventos_por_time
+from comum.jogadores import estatisticas_jogadores
+
+EVENTOS = pd.DataFrame([
+    {"team": "A", "player_id": 1, "player": "Ana", "minute": 0, "type": "Pass"},
+    {"team": "A", "player_id": 1, "player": "Ana", "minute": 10, "type": "Shot", "shot_outcome": "Goal"},
+    {"team": "A", "player_id": 1, "player": "Ana", "minute": 30, "type": "Foul Committed", "foul_committed_card": "Yellow Card"},
+    {"team": "A", "player_id": 2, "player": "Bia", "minute": 40, "type": "Bad Behaviour", "bad_behaviour_card": "Yellow Card"},
+    {"team": "B", "player_id": 3, "player": "Caio", "minute": 50, "type": "Bad Behaviour", "bad_behaviour_card": "Red Card"},
+    {"team": "B", "player_id": 4, "player": "Duda", "minute": 60, "type": "Foul Committed", "foul_committed_card": "Red Card"},
+    {"team": "B", "player_id": 4, "player": "Duda", "minute": 70, "type": "Duel", "duel_type": "Tackle"},
+    {"team": "B", "player_id": 4, "player": "Duda", "minute": 75, "type": "Duel", "duel_type": "Aerial Lost"},
+    {"team": "B", "player_id": None, "player": None, "minute": 90, "type": "Half End"},
+])
+
+
+def test_cartoes_contam_as_duas_colunas():
+    jogadores = estatisticas_jogadores(EVENTOS)
+
+    assert {j["player_name"]: (j["yellow_cards"], j["red_cards"]) for j in jogadores.values()} == {
+        "Ana": (1, 0), "Bia": (1, 0), "Caio": (0, 1), "Duda": (0, 1),
+    }
+
+
+def test_soma_dos_jogadores_bate_com_os_totais_do_time():
+    jogadores = estatisticas_jogadores(EVENTOS)
+    times = dict(zip(EVENTOS["player_id"], EVENTOS["team"]))
+
+    for time_, totais in identificar_eventos_por_time(EVENTOS).items():
+        do_time = [j for player_id, j in jogadores.items() if times[player_id] == time_]
+        assert sum(j["yellow_cards"] for j in do_time) == totais["cartoes_amarelos"]
+        assert sum(j["red_cards"] for j in do_time) == totais["cartoes_vermelhos"]
+        assert sum(j["goals"] for j in do_time) == totais["gols"].sum()
+        assert sum(j["passes"] for j in do_time) == totais["passes"].sum()
+
+
+def test_desarmes_sao_duelos_do_tipo_tackle():
+    assert {j["player_name"]: j["tackles"] for j in estatisticas_jogadores(EVENTOS).values()} == {
+        "Ana": 0, "Bia": 0, "Caio": 0, "Duda": 1,
+    }
+
+
+def test_perfil_basico():
+    ana = estatisticas_jogadores(EVENTOS)[1]
+
+    assert ana == {"player_id": 1, "player_name": "Ana", "passes": 1, "shots": 1, "goals": 1, "tackles": 0,
+                   "yellow_cards": 1, "red_cards": 0, "minutes_played": 30}
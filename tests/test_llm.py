@@ -0,0 +1,145 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from comum import llm
+from comum.cache_narracoes import CacheNarracoes
+from comum.llm import BackendFalso, BaldeTokens, ClienteLLM, LLMIndisponivel
+
+
+class ServiceUnavailable(Exception):
+    """Mesmo nome da exceção do google.api_core: é reconhecida como erro temporário."""
+
+
+def cliente(backend, esperas=None, **opcoes):
+    opcoes.setdefault("requisicoes_por_minuto", 60000)
+    dormir = esperas.append if esperas is not None else (lambda segundos: None)
+    return ClienteLLM("falso", backend, dormir=dormir, **opcoes)
+
+
+def test_repete_erros_temporarios_com_espera_exponencial_e_jitter(monkeypatch):
+    sorteios = []
+
+    def uniform(minimo, maximo):
+        sorteios.append((minimo, maximo))
+        return maximo / 2
+
+    monkeypatch.setattr(llm.random, "uniform", uniform)
+    backend = BackendFalso(texto="ok", falhas=[ServiceUnavailable(), TimeoutError(), ServiceUnavailable()])
+    esperas = []
+
+    assert cliente(backend, esperas, tentativas=4, espera_base=0.5, espera_max=1.5).gerar("prompt") == "ok "
+    assert backend.chamadas == 4
+    # Espera sorteada entre 0 e base * 2^tentativa, limitada a espera_max.
+    assert sorteios == [(0, 0.5), (0, 1.0), (0, 1.5)]
+    assert esperas == [0.25, 0.5, 0.75]
+
+
+def test_desiste_com_llm_indisponivel_quando_as_tentativas_acabam():
+    backend = BackendFalso(falhas=[ServiceUnavailable()] * 5)
+    esperas = []
+
+    try:
+        cliente(backend, esperas, tentativas=3).gerar("prompt")
+    except LLMIndisponivel as erro:
+        assert isinstance(erro.__cause__, ServiceUnavailable)
+    else:
+        raise AssertionError("deveria ter levantado LLMIndisponivel")
+    assert backend.chamadas == 3
+    assert len(esperas) == 2
+
+
+def test_erro_nao_temporario_falha_na_hora():
+    backend = BackendFalso(falhas=[ValueError("prompt inválido")])
+    esperas = []
+
+    try:
+        cliente(backend, esperas).gerar("prompt")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("deveria ter levantado ValueError")
+    assert backend.chamadas == 1
+    assert esperas == []
+
+
+def test_em_partes_nao_repete_depois_da_primeira_parte():
+    class FalhaNoMeio(BackendFalso):
+        def gerar_em_partes(self, modelo, prompt, timeout):
+            yield from super().gerar_em_partes(modelo, prompt, timeout)
+            raise ServiceUnavailable()
+
+    backend = FalhaNoMeio(texto="a b")
+    partes = []
+    try:
+        for parte in cliente(backend).gerar_em_partes("prompt"):
+            partes.append(parte)
+    except ServiceUnavailable:
+        pass
+    else:
+        raise AssertionError("deveria ter levantado ServiceUnavailable")
+    assert partes == ["a ", "b "]
+    assert backend.chamadas == 1
+
+
+def test_semaforo_limita_as_chamadas_simultaneas():
+    class BackendContador(BackendFalso):
+        def __init__(self):
+            super().__init__(texto="ok")
+            self.ativas = 0
+            self.maximo = 0
+
+        def gerar(self, modelo, prompt, timeout):
+            with self._lock:
+                self.ativas += 1
+                self.maximo = max(self.maximo, self.ativas)
+            time.sleep(0.05)
+            with self._lock:
+                self.ativas -= 1
+            return super().gerar(modelo, prompt, timeout)
+
+    backend = BackendContador()
+    compartilhado = cliente(backend, max_concorrentes=2)
+    threads = [threading.Thread(target=compartilhado.gerar, args=("prompt",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.chamadas == 8
+    assert backend.maximo == 2
+
+
+def test_balde_de_tokens_limita_a_taxa():
+    agora = [0.0]
+    esperas = []
+
+    def dormir(segundos):
+        esperas.append(segundos)
+        agora[0] += segundos
+
+    balde = BaldeTokens(taxa=2, capacidade=2, relogio=lambda: agora[0], dormir=dormir)
+    for _ in range(6):
+        balde.adquirir()
+
+    # As 2 primeiras usam a rajada; as outras 4 saem a 2 por segundo.
+    assert esperas == [0.5] * 4
+    assert agora[0] == 2.0
+
+
+def test_team_events_responde_503_quando_o_llm_esgota_as_tentativas(api, monkeypatch, tmp_path):
+    async def dados_partida(match_id):
+        return {"eventos": None}
+
+    esgotado = cliente(BackendFalso(falhas=[ServiceUnavailable()] * 3), tentativas=3)
+    monkeypatch.setattr(api, "carregar_dados_partida", dados_partida)
+    monkeypatch.setattr(api, "resumo_eventos_por_time", lambda eventos: [])
+    monkeypatch.setattr(api, "cliente_llm", lambda: esgotado)
+    monkeypatch.setattr(api, "cache_narracoes", CacheNarracoes(str(tmp_path / "narracoes.sqlite")))
+
+    resposta = TestClient(api.app).get("/team_events", params={"match_id": 7585})
+
+    assert resposta.status_code == 503
+    assert resposta.headers["retry-after"] == "30"
+    assert "3 tentativas" in resposta.json()["detail"]
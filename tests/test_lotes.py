@@ -0,0 +1,64 @@
+import math
+import time
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from comum import armazenamento
+
+PARTIDA = {
+    "home_team": "Time A", "away_team": "Time B", "home_score": 2, "away_score": 1, "competition": "Copa",
+    "competition_stage": "Final", "stadium": "Estádio", "referee": "Árbitro", "home_managers": "Técnico A",
+    "away_managers": "Técnico B", "season": "2018", "match_date": "2018-07-15", "kick_off": "17:00:00.000",
+}
+
+
+def test_match_summary_batch_erro_de_um_item_nao_derruba_o_lote(api, monkeypatch):
+    partidas = pd.DataFrame([{**PARTIDA, "match_id": 1}, {**PARTIDA, "match_id": 2, "referee": math.nan}])
+    monkeypatch.setattr(armazenamento, "carregar_partidas", lambda competition_id, season_id: partidas)
+
+    resposta = TestClient(api.app).post("/match_summary/batch", json={"match_ids": [1, 2, 3], "competition_id": 43, "season_id": 3})
+
+    assert resposta.status_code == 200
+    um, dois, tres = resposta.json()["results"]
+    assert um["summary"]["referee"] == "Árbitro" and um["error"] is None
+    assert dois["summary"] is None and "referee" in dois["error"]
+    assert tres["summary"] is None and tres["error"] == "Partida não encontrada"
+
+
+def test_player_profile_batch_erro_de_um_item_nao_derruba_o_lote(api, monkeypatch):
+    jogadores = {
+        10: {"player_id": 10, "player_name": "Ana", "passes": 30, "shots": 2, "tackles": 1, "minutes_played": 90},
+        11: {"player_id": 11, "player_name": "Bia", "passes": 5, "shots": 0, "tackles": 0, "minutes_played": math.nan},
+    }
+
+    async def carregar_dados_partida(match_id):
+        return {"eventos": None, "jogadores": jogadores}
+
+    monkeypatch.setattr(api, "carregar_dados_partida", carregar_dados_partida)
+
+    resposta = TestClient(api.app).post("/player_profile/batch", json={"match_id": 7585, "player_ids": [10, 11, 12]})
+
+    assert resposta.status_code == 200
+    ana, bia, ninguem = resposta.json()["results"]
+    assert ana["profile"]["passes"] == 30 and ana["error"] is None
+    assert bia["profile"] is None and "minutes_played" in bia["error"]
+    assert ninguem["error"] == "Jogador não encontrado na partida"
+
+
+def test_lote_sem_temporada_carrega_a_temporada_uma_vez(api, monkeypatch):
+    carregamentos = []
+
+    def carregar_partidas(competition_id, season_id):
+        carregamentos.append((competition_id, season_id))
+        time.sleep(0.1)
+        return pd.DataFrame([{**PARTIDA, "match_id": match_id} for match_id in range(50)])
+
+    monkeypatch.setattr(armazenamento, "carregar_partidas", carregar_partidas)
+    monkeypatch.setattr(armazenamento, "temporadas_salvas", lambda: [(43, 3)])
+
+    resposta = TestClient(api.app).post("/match_summary/batch", json={"match_ids": list(range(50))})
+
+    assert resposta.status_code == 200
+    assert all(item["error"] is None for item in resposta.json()["results"])
+    assert carregamentos == [(43, 3)]
@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from comum.cache_narracoes import CacheNarracoes
+from comum.llm import BackendFalso, ClienteLLM
+from comum.streaming import evento_sse, ler_eventos_sse
+
+RESUMO = [{"team": "Time A", "goals": 1}]
+
+
+@pytest.fixture
+def stream(api, monkeypatch, tmp_path):
+    """Abre o /team_events/stream com os eventos da partida e o LLM trocados por versões locais;
+    devolve a lista de (evento, dados) lida como o streamlit/api_st.py lê."""
+    async def dados_partida(match_id):
+        return {"eventos": None}
+
+    monkeypatch.setattr(api, "carregar_dados_partida", dados_partida)
+    monkeypatch.setattr(api, "resumo_eventos_por_time", lambda eventos: RESUMO)
+    monkeypatch.setattr(api, "cache_narracoes", CacheNarracoes(str(tmp_path / "narracoes.sqlite")))
+
+    def abrir(backend, **params):
+        llm = ClienteLLM("falso", backend, requisicoes_por_minuto=60000, dormir=lambda segundos: None)
+        monkeypatch.setattr(api, "cliente_llm", lambda: llm)
+        with TestClient(api.app).stream("GET", "/team_events/stream", params={"match_id": 7585, **params}) as resposta:
+            assert resposta.status_code == 200
+            assert resposta.headers["content-type"].startswith("text/event-stream")
+            return list(ler_eventos_sse(resposta.iter_lines()))
+
+    return abrir
+
+
+def test_ordem_summary_tokens_done(stream):
+    eventos = stream(BackendFalso(texto="Começa a partida"))
+
+    assert [evento for evento, _ in eventos] == ["summary", "token", "token", "token", "done"]
+    assert eventos[0][1] == RESUMO
+    assert "".join(dados["text"] for evento, dados in eventos if evento == "token") == "Começa a partida "
+    assert eventos[-1][1] == {"narration": "Começa a partida ", "cached": False}
+
+
+def test_narracao_em_cache_sai_em_um_token(stream):
+    stream(BackendFalso(texto="Começa a partida"))
+    backend = BackendFalso(texto="outra narração")
+
+    eventos = stream(backend)
+
+    assert [evento for evento, _ in eventos] == ["summary", "token", "done"]
+    assert eventos[-1][1] == {"narration": "Começa a partida ", "cached": True}
+    assert backend.chamadas == 0
+
+
+def test_falha_do_backend_vira_evento_error(stream):
+    eventos = stream(BackendFalso(falhas=[ValueError("quota inválida")]), force_refresh=True)
+
+    assert [evento for evento, _ in eventos] == ["summary", "error"]
+    assert "quota inválida" in eventos[-1][1]["detail"]
+
+
+def test_ler_eventos_sse_le_o_que_evento_sse_escreve():
+    texto = evento_sse("token", {"text": "olá\nmundo"}) + evento_sse("done", {"ok": True})
+
+    assert list(ler_eventos_sse(texto.split("\n"))) == [("token", {"text": "olá\nmundo"}), ("done", {"ok": True})]